@@ -0,0 +1,141 @@
+import math
+import mmap
+import os
+import random
+import struct
+
+# magic, format version, grid size, reserved, record count
+HEADER = struct.Struct("<4sBBHQ")
+MAGIC = b"SDKB"
+VERSION = 1
+
+
+class PuzzleBank:
+    def __init__(self, path, N=None, writable=False):
+        """
+        Open a bank of pre-generated puzzles, creating it if needed.
+
+        A bank is an append-only file: a fixed-size header followed by
+        fixed-width records, each holding the puzzle and then its solution,
+        one byte per cell in row order. Record `i` therefore starts at
+        `HEADER.size + i * record_size`, and records are read through a
+        read-only shared `mmap`, so any number of game processes can draw
+        from one bank without loading it.
+
+        Only one process should append to a bank at a time. The record count
+        in the header is written after the record itself, so readers never
+        see a partial record.
+
+        :param path: The path of the bank file
+        :param N: The grid size, required when creating a new bank
+        :param writable: Whether puzzles will be appended
+        :return: None
+        """
+        self.path = path
+        if not os.path.exists(path):
+            if N is None:
+                raise FileNotFoundError(f"no puzzle bank at {path}, pass N to create one")
+            with open(path, "xb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, N, 0, 0))
+            writable = True
+        self.file = open(path, "r+b" if writable else "rb")
+        magic, version, size, _, _ = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank")
+        if N is not None and N != size:
+            raise ValueError(f"{path} holds {size}x{size} puzzles, not {N}x{N}")
+        self.N = size
+        self.SRN = int(math.sqrt(size))
+        self.cells = size * size
+        self.record_size = 2 * self.cells
+        self._map = None
+
+    def __len__(self):
+        """
+        Return the number of puzzles in the bank, including ones appended by
+        other processes since the bank was opened.
+        """
+        return HEADER.unpack_from(self._view())[4]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _view(self, end=HEADER.size):
+        """
+        Return the shared mapping of the file, remapping it if it does not
+        reach `end` yet because the file has grown.
+
+        :param end: The offset the mapping must cover
+        :return: An mmap of the whole file
+        """
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def append(self, puzzle, solution):
+        """
+        Append a puzzle and its solution to the end of the bank.
+
+        :param puzzle: The puzzle table, 0 for an empty cell
+        :param solution: The answer table
+        :return: The index of the new record
+        """
+        record = bytearray()
+        for table in (puzzle, solution):
+            for line in table:
+                if len(line) != self.N:
+                    raise ValueError(f"expected a {self.N}x{self.N} table")
+                record.extend(line)
+        if len(record) != self.record_size:
+            raise ValueError(f"expected a {self.N}x{self.N} table")
+        index = len(self)
+        self.file.seek(HEADER.size + index * self.record_size)
+        self.file.write(record)
+        self.file.flush()
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.N, 0, index + 1))
+        self.file.flush()
+        return index
+
+    def get(self, index):
+        """
+        Read one record of the bank.
+
+        :param index: The index of the record
+        :return: A (puzzle, solution) pair of tables
+        """
+        count = len(self)
+        if not 0 <= index < count:
+            raise IndexError(f"puzzle {index} out of range for a bank of {count}")
+        start = HEADER.size + index * self.record_size
+        view = self._view(start + self.record_size)
+        N = self.N
+        puzzle = [list(view[start + row * N:start + (row + 1) * N]) for row in range(N)]
+        start += self.cells
+        solution = [list(view[start + row * N:start + (row + 1) * N]) for row in range(N)]
+        return puzzle, solution
+
+    def draw(self, rng=random):
+        """
+        Read a random record of the bank.
+
+        :param rng: The random generator to pick the record with
+        :return: A (puzzle, solution) pair of tables
+        """
+        return self.get(rng.randrange(len(self)))
+
+    def close(self):
+        """
+        Release the mapping and the file handle.
+
+        :return: None
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.file.close()
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from bank import PuzzleBank
+from canonical import MAX_CANONICAL_SIZE, PuzzleIndex
+from grader import BANDS
+from sudoku import Sudoku
+
+# attempts allowed per requested puzzle before giving up on a band
+MAX_ATTEMPTS = 1000
+
+
+def _generate_chunk(N, E, unique, seed, count, max_steps=None):
+    """
+    Generate a chunk of puzzles in a worker process.
+
+    The chunk draws the seed of each `Sudoku` from its own random stream, so
+    a chunk is reproducible from `seed` alone.
+
+    :param N: The size of the grid
+    :param E: The number of empty cells per puzzle
+    :param unique: Whether puzzles must have a single solution
+    :param seed: The seed of the chunk's random stream
+    :param count: The number of puzzles to generate
+    :param max_steps: The step budget of one fill attempt, see `Sudoku.max_steps`
+    :return: A list of (puzzle, solution) pairs
+    """
+    rng = random.Random(seed)
+    chunk = []
+    for _ in range(count):
+        sudoku = Sudoku(N, E, unique=unique, seed=rng.getrandbits(64), max_steps=max_steps)
+        chunk.append((sudoku.puzzle_table(), sudoku.puzzle_answers()))
+    return chunk
+
+
+def generate_batch(n, N, E, jobs=None, unique=True, seed=None, chunksize=16, max_steps=None):
+    """
+    Generate puzzles in parallel across a process pool.
+
+    Work is split into chunks of `chunksize` puzzles, each generated from its
+    own seeded random stream. At most a few chunks per worker are in flight at
+    once, so large batches don't queue up every task up front.
+
+    :param n: The number of puzzles to generate
+    :param N: The size of the grid
+    :param E: The number of empty cells per puzzle
+    :param jobs: The number of worker processes, defaults to the CPU count
+    :param unique: Whether puzzles must have a single solution
+    :param seed: The seed that all chunk seeds are drawn from
+    :param chunksize: The number of puzzles per task
+    :param max_steps: The step budget of one fill attempt, see `Sudoku.max_steps`
+    :return: A generator of (puzzle, solution) pairs, in completion order
+    """
+    jobs = jobs or os.cpu_count() or 1
+    seeds = random.Random(seed)
+    remaining = n
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = set()
+        while remaining or pending:
+            while remaining and len(pending) < jobs * 2:
+                count = min(chunksize, remaining)
+                remaining -= count
+                pending.add(
+                    pool.submit(_generate_chunk, N, E, unique, seeds.getrandbits(64), count, max_steps)
+                )
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def _attempt_band(N, E, band, seed, max_steps=None):
+    """
+    Make one attempt at a puzzle in a difficulty band, in a worker process.
+
+    :param N: The size of the grid
+    :param E: The most empty cells per puzzle
+    :param band: The name of a band in grader.BANDS
+    :param seed: The seed of the attempt
+    :param max_steps: The step budget of one fill attempt, see `Sudoku.max_steps`
+    :return: A (puzzle, solution) pair, or None if the puzzle came out too easy
+    """
+    try:
+        sudoku = Sudoku(N, E, seed=seed, band=band, max_attempts=1, max_steps=max_steps)
+    except RuntimeError:
+        return None
+    return sudoku.puzzle_table(), sudoku.puzzle_answers()
+
+
+def generate_graded(n, band, N, E=None, jobs=None, seed=None, max_steps=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Generate puzzles in a difficulty band by racing seeds across a process pool.
+
+    Every task is a single seeded attempt, see `Sudoku.band`, so the workers
+    race each other and attempts that come out too easy cost one task each.
+    Queued attempts are cancelled once n puzzles have been accepted, or once
+    max_attempts * n attempts have been made, since some bands can't be
+    reached at all on small grids.
+
+    :param n: The number of puzzles to generate
+    :param band: The name of a band in grader.BANDS
+    :param N: The size of the grid
+    :param E: The most empty cells per puzzle, defaults to all of them
+    :param jobs: The number of worker processes, defaults to the CPU count
+    :param seed: The seed that all attempt seeds are drawn from
+    :param max_steps: The step budget of one fill attempt, see `Sudoku.max_steps`
+    :param max_attempts: The attempts allowed per requested puzzle
+    :return: A generator of (puzzle, solution, attempts) triples, in
+        completion order, where attempts counts the attempts finished since
+        the previous accepted puzzle, this one included
+    :raises RuntimeError: If the attempts run out before n puzzles are accepted
+    """
+    E = N * N if E is None else E
+    jobs = jobs or os.cpu_count() or 1
+    seeds = random.Random(seed)
+    accepted = attempts = submitted = 0
+    limit = max_attempts * n
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        pending = set()
+        while accepted < n:
+            if not pending and submitted == limit:
+                raise RuntimeError(
+                    f"only {accepted} of {n} puzzles in the {band} band after {limit} attempts"
+                )
+            while len(pending) < jobs * 2 and submitted < limit:
+                pending.add(pool.submit(_attempt_band, N, E, band, seeds.getrandbits(64), max_steps))
+                submitted += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempts += 1
+                result = future.result()
+                if result is not None and accepted < n:
+                    accepted += 1
+                    yield result + (attempts,)
+                    attempts = 0
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def skip_duplicates(puzzles, index):
+    """
+    Drop puzzles that are equivalent to one already in an index.
+
+    :param puzzles: An iterable of (puzzle, solution) pairs
+    :param index: A `PuzzleIndex`, new puzzles are added to it
+    :return: A generator of the (puzzle, solution) pairs that were new
+    """
+    for puzzle, solution in puzzles:
+        if index.add(puzzle)[1]:
+            yield puzzle, solution
+
+
+def _report_attempts(graded):
+    """
+    Pass on the pairs of `generate_graded` and print the attempts per
+    accepted puzzle to stderr at the end.
+
+    :param graded: A generator of (puzzle, solution, attempts) triples
+    :return: A generator of (puzzle, solution) pairs
+    """
+    accepted = attempts = 0
+    for puzzle, solution, tries in graded:
+        accepted += 1
+        attempts += tries
+        yield puzzle, solution
+    if accepted:
+        print(
+            f"accepted {accepted} puzzles in {attempts} attempts, "
+            f"{attempts / accepted:.1f} attempts per puzzle",
+            file=sys.stderr,
+        )
+
+
+def main(argv=None):
+    """
+    Command line entry point, writes one JSON object per puzzle, or appends
+    the puzzles to a puzzle bank.
+
+    :param argv: The arguments to parse, defaults to sys.argv
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles in parallel.")
+    parser.add_argument("-n", "--count", type=int, default=100, help="number of puzzles")
+    parser.add_argument("-N", "--size", type=int, default=9, help="grid size")
+    parser.add_argument("-E", "--empty", type=int, default=None, help="empty cells per puzzle, default N*N//2, or at most, default all, with --band")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes, default CPU count")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible batch")
+    parser.add_argument("--no-unique", dest="unique", action="store_false", help="skip the uniqueness check")
+    parser.add_argument("-o", "--output", default="-", help="output file, default stdout")
+    parser.add_argument("--bank", default=None, help="append to this puzzle bank instead")
+    parser.add_argument("--dedupe", action="store_true", help="skip puzzles equivalent to one already written")
+    parser.add_argument("--max-steps", type=int, default=None, help="restart a fill attempt after this many steps, default unbounded")
+    parser.add_argument("--band", choices=sorted(BANDS), default=None, help="only keep puzzles in this difficulty band")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS, help=f"attempts per puzzle before giving up on --band, default {MAX_ATTEMPTS}")
+    args = parser.parse_args(argv)
+    if args.dedupe and args.size > MAX_CANONICAL_SIZE:
+        parser.error(f"--dedupe only supports --size up to {MAX_CANONICAL_SIZE}")
+
+    if args.band is not None:
+        puzzles = _report_attempts(generate_graded(
+            args.count, args.band, args.size, args.empty, args.jobs, seed=args.seed,
+            max_steps=args.max_steps, max_attempts=args.max_attempts,
+        ))
+    else:
+        E = args.empty if args.empty is not None else (args.size * args.size) // 2
+        puzzles = generate_batch(
+            args.count, args.size, E, args.jobs, unique=args.unique, seed=args.seed,
+            max_steps=args.max_steps,
+        )
+    try:
+        _write(args, puzzles)
+    except RuntimeError as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+
+
+def _write(args, puzzles):
+    """
+    Write the puzzles of the command line to a bank or as JSON lines.
+
+    :param args: The parsed command line arguments
+    :param puzzles: An iterable of (puzzle, solution) pairs
+    :return: None
+    """
+    if args.dedupe:
+        index = PuzzleIndex()
+        puzzles = skip_duplicates(puzzles, index)
+    if args.bank is not None:
+        with PuzzleBank(args.bank, args.size, writable=True) as bank:
+            if args.dedupe:
+                for existing in range(len(bank)):
+                    index.add(bank.get(existing)[0])
+            for puzzle, solution in puzzles:
+                bank.append(puzzle, solution)
+        return
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for puzzle, solution in puzzles:
+            out.write(json.dumps({"puzzle": puzzle, "solution": solution}) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
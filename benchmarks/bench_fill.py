@@ -0,0 +1,136 @@
+"""
+Benchmark the iterative fill_remaining against the old recursive one.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fill [--seeds 5] [--max-steps 200000]
+
+Both engines visit cells and numbers in the same order, so for a given seed
+they take exactly the same steps. Each run is capped at --max-steps
+placements, since plain row-major backtracking is heavy-tailed from 16x16
+up, and the report compares time per step at the same work.
+
+The recursive engine needs one frame per cell it walks past, filled or not.
+The second table starts each engine on a solved grid with its last row
+emptied, so the walk spans all N*N cells, and shows where it fails with
+RecursionError.
+"""
+import argparse
+import sys
+import time
+
+from solver import solve
+from sudoku import Sudoku
+
+SIZES = (9, 16, 25, 36)
+
+
+class StepLimit(Exception):
+    pass
+
+
+def recursive_fill(sudoku, row, col, max_steps):
+    """
+    The recursive fill_remaining that the iterative engine replaced, with a
+    step cap so both engines can be compared on the same amount of work.
+
+    :return: True if the table is fully filled, False otherwise
+    """
+    steps = [0]
+
+    def fill(row, col):
+        if row == sudoku.N - 1 and col == sudoku.N:
+            return True
+        if col == sudoku.N:
+            row += 1
+            col = 0
+        if sudoku.table[row][col] != 0:
+            return fill(row, col + 1)
+        for num in range(1, sudoku.N + 1):
+            if sudoku.safe_position(row, col, num):
+                sudoku.set_cell(row, col, num)
+                steps[0] += 1
+                if steps[0] == max_steps:
+                    raise StepLimit
+                if fill(row, col + 1):
+                    return True
+                sudoku.clear_cell(row, col)
+        return False
+
+    try:
+        return fill(row, col)
+    except StepLimit:
+        return False
+
+
+def blank(N, seed):
+    """
+    Return a seeded table with only its diagonal subgroups filled.
+    """
+    sudoku = Sudoku(N, 0, seed=seed, generate=False)
+    sudoku.fill_diagonal()
+    return sudoku
+
+
+def nearly_solved(grid):
+    """
+    Return a table holding a solved grid with its last row emptied.
+    """
+    N = len(grid)
+    sudoku = Sudoku(N, 0, generate=False)
+    for row in range(N - 1):
+        for col in range(N):
+            sudoku.set_cell(row, col, grid[row][col])
+    return sudoku
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--max-steps", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    print(f"recursion limit {sys.getrecursionlimit()}, cap {args.max_steps} steps per run")
+    for N in SIZES:
+        iter_time = rec_time = 0.0
+        filled = rec_errors = 0
+        for seed in range(args.seeds):
+            sudoku = blank(N, seed)
+            began = time.perf_counter()
+            filled += sudoku.fill_remaining(0, sudoku.SRN, args.max_steps)
+            iter_time += time.perf_counter() - began
+
+            sudoku = blank(N, seed)
+            began = time.perf_counter()
+            try:
+                recursive_fill(sudoku, 0, sudoku.SRN, args.max_steps)
+            except RecursionError:
+                rec_errors += 1
+            rec_time += time.perf_counter() - began
+        speedup = f"{rec_time / iter_time:.1f}x" if not rec_errors else "n/a"
+        print(
+            f"N={N:2}: iterative {iter_time * 1000 / args.seeds:8.1f} ms/run, "
+            f"{filled}/{args.seeds} filled | "
+            f"recursive {rec_time * 1000 / args.seeds:8.1f} ms/run, "
+            f"{rec_errors} RecursionError | speedup {speedup}"
+        )
+
+    print("solved grid with the last row emptied:")
+    for N in SIZES:
+        grid = solve([[0] * N for _ in range(N)])
+        sudoku = nearly_solved(grid)
+        began = time.perf_counter()
+        ok = sudoku.fill_remaining(0, 0) and sudoku.table == grid
+        iter_ms = (time.perf_counter() - began) * 1000
+        try:
+            recursive_fill(nearly_solved(grid), 0, 0, None)
+            rec_result = "ok"
+        except RecursionError:
+            rec_result = "RecursionError"
+        print(
+            f"N={N:2}: {N * N:4} cells, iterative {'ok' if ok else 'FAILED'} "
+            f"in {iter_ms:.2f} ms | recursive {rec_result}"
+        )
+
+if __name__ == "__main__":
+    main()
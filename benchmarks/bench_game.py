@@ -0,0 +1,82 @@
+"""
+Benchmark whole games played through the headless game state.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_game [--games 300] [--seed 0]
+
+Generates 9x9 puzzles up front, then plays each one to the end with a
+scripted player that notes candidates, sometimes places a wrong number and
+erases it, and finally places every answer. Nothing is drawn, so this
+measures the game rules alone.
+"""
+import argparse
+import random
+import time
+
+from game_state import GameState
+from sudoku import Sudoku
+
+E = 45
+# chance of noting a few candidates, and of placing a wrong number first
+NOTE_CHANCE = 0.5
+MISTAKE_CHANCE = 0.05
+
+
+def play(state, rng):
+    """
+    Play a game to the end.
+
+    :param state: A fresh `GameState`
+    :param rng: The random.Random deciding the player's moves
+    :return: The number of actions taken
+    """
+    N = state.N
+    empty = [(row, col) for row in range(N) for col in range(N) if state.board[row][col] == 0]
+    rng.shuffle(empty)
+    actions = 0
+    for row, col in empty:
+        if rng.random() < NOTE_CHANCE:
+            for num in rng.sample(range(1, N + 1), 3):
+                state.note(row, col, num)
+                actions += 1
+    state.toggle_mode()
+    actions += 1
+    for row, col in empty:
+        answer = state.answers[row][col]
+        if state.lives > 1 and rng.random() < MISTAKE_CHANCE:
+            state.place(row, col, answer % N + 1)
+            state.erase(row, col)
+            actions += 2
+        state.place(row, col, answer)
+        actions += 1
+    return actions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    seeds = random.Random(args.seed)
+    puzzles = []
+    for _ in range(args.games):
+        sudoku = Sudoku(9, E, seed=seeds.getrandbits(64))
+        puzzles.append((sudoku.puzzle_table(), sudoku.puzzle_answers()))
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    actions = solved = 0
+    for puzzle, answers in puzzles:
+        state = GameState(puzzle, answers)
+        actions += play(state, rng)
+        solved += state.solved()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(puzzles) / elapsed:7.0f} games/s, {actions / elapsed:9.0f} actions/s, "
+        f"{solved}/{len(puzzles)} solved"
+    )
+
+
+if __name__ == "__main__":
+    main()
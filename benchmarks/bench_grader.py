@@ -0,0 +1,46 @@
+"""
+Benchmark the human-technique grader.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_grader [--puzzles 300] [--seed 0]
+
+Generates unique-solution 9x9 puzzles up front, then reports how many of
+them the grader handles per second and which techniques they needed.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from grader import grade
+from sudoku import Sudoku
+
+E_VALUES = (40, 50, 55)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--puzzles", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    seeds = random.Random(args.seed)
+    for E in E_VALUES:
+        puzzles = [
+            Sudoku(9, E, unique=True, seed=seeds.getrandbits(64)).puzzle_table()
+            for _ in range(args.puzzles)
+        ]
+        start = time.perf_counter()
+        grades = [grade(puzzle) for puzzle in puzzles]
+        elapsed = time.perf_counter() - start
+        hardest = Counter(result.hardest for result in grades)
+        solved = sum(result.solved for result in grades)
+        print(
+            f"E={E}: {len(puzzles) / elapsed:7.0f} puzzles/s, "
+            f"{solved}/{len(puzzles)} solved by logic, hardest {dict(hardest.most_common())}"
+        )
+
+
+if __name__ == "__main__":
+    main()
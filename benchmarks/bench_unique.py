@@ -0,0 +1,65 @@
+"""
+Benchmark 9x9 generation with uniqueness-checked hole digging.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_unique [--runs 200] [--seed 0]
+
+Exits with status 1 if the 95th percentile exceeds BUDGET_MS.
+"""
+import argparse
+import random
+import sys
+import time
+
+from solver import count_solutions
+from sudoku import Sudoku
+
+# a new game must be ready well inside a couple of frames at 30 FPS
+BUDGET_MS = 60
+N = 9
+E_VALUES = (40, 50, 55)
+
+
+def percentile(samples, pct):
+    """
+    Return the nearest-rank percentile of a list of samples.
+
+    :param samples: A sorted list of numbers
+    :param pct: The percentile, between 0 and 100
+    :return: The sample at that rank
+    """
+    rank = max(1, -(-len(samples) * pct // 100))
+    return samples[int(rank) - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    seeds = random.Random(args.seed)
+    over_budget = False
+    for E in E_VALUES:
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            sudoku = Sudoku(N, E, unique=True, seed=seeds.getrandbits(64))
+            samples.append((time.perf_counter() - start) * 1000)
+            assert count_solutions(sudoku.answerable_table, 2) == 1
+        samples.sort()
+        p95 = percentile(samples, 95)
+        if E == E_VALUES[0]:
+            over_budget = p95 > BUDGET_MS
+        print(
+            f"N={N} E={E}: p50 {percentile(samples, 50):.1f} ms, "
+            f"p95 {p95:.1f} ms, max {samples[-1]:.1f} ms"
+        )
+    status = "OVER" if over_budget else "within"
+    print(f"E={E_VALUES[0]} p95 is {status} the {BUDGET_MS} ms budget")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
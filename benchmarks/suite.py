@@ -0,0 +1,177 @@
+"""
+Benchmark suite for the Sudoku generator.
+
+Run from the repository root:
+
+    python -m benchmarks.suite run -o results.json [--runs 100]
+    python -m benchmarks.suite compare results.json [--baseline benchmarks/baseline.json]
+
+`run` times fill_diagonal, fill_remaining, remove_digits and end-to-end
+Sudoku(N, E) over a fixed set of seeds and writes the p50/p95/p99 of each
+case to JSON. Backtracking makes these times heavy-tailed, so the tail
+percentiles matter as much as the median. `compare` flags every case whose
+p50 or p95 got slower than the baseline by more than --threshold (and by
+more than --min-delta ms), and exits with status 1 if there is any.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmarks.bench_unique import percentile
+from sudoku import Sudoku
+
+BASELINE = "benchmarks/baseline.json"
+# (N, E values, share of --runs), the game itself plays 9x9 with E=40
+CASES = (
+    (4, (4, 8), 1),
+    (9, (20, 40, 55), 1),
+    (16, (64, 128), 0.2),
+)
+# step budget of one fill attempt, see Sudoku.max_steps
+MAX_STEPS = 20000
+
+
+def summarize(samples):
+    """
+    Return the distribution of a list of timings in milliseconds.
+
+    :param samples: The timings, in seconds
+    :return: A dict of statistics
+    """
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        "runs": len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "mean": sum(samples) / len(samples),
+        "max": samples[-1],
+    }
+
+
+def timed(func, *args):
+    """
+    Call a function and return how long it took in seconds.
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run_suite(runs, seed):
+    """
+    Time every generator stage for every case.
+
+    :param runs: The number of samples per case at full share
+    :param seed: The seed the per-sample seeds are drawn from
+    :return: A dict from case name to its statistics
+    """
+    results = {}
+    for N, E_values, share in CASES:
+        count = max(10, int(runs * share))
+        seeds = random.Random(seed).sample(range(1 << 30), count)
+        diagonal, remaining, capped = [], [], 0
+        for sample_seed in seeds:
+            sudoku = Sudoku(N, 0, seed=sample_seed, generate=False)
+            diagonal.append(timed(sudoku.fill_diagonal))
+            start = time.perf_counter()
+            capped += not sudoku.fill_remaining(0, sudoku.SRN, MAX_STEPS)
+            remaining.append(time.perf_counter() - start)
+        results[f"N={N} fill_diagonal"] = summarize(diagonal)
+        results[f"N={N} fill_remaining"] = dict(summarize(remaining), capped=capped)
+        for E in E_values:
+            removal, end_to_end = [], []
+            for sample_seed in seeds:
+                start = time.perf_counter()
+                Sudoku(N, E, unique=True, seed=sample_seed, max_steps=MAX_STEPS)
+                end_to_end.append(time.perf_counter() - start)
+                # the same table again, freshly filled, so only the digging is timed
+                sudoku = Sudoku(N, E, unique=True, seed=sample_seed, generate=False, max_steps=MAX_STEPS)
+                sudoku.fill_table()
+                removal.append(timed(sudoku.remove_digits))
+            results[f"N={N} E={E} remove_digits"] = summarize(removal)
+            results[f"N={N} E={E} Sudoku"] = summarize(end_to_end)
+    return results
+
+
+def compare(current, baseline, threshold, min_delta):
+    """
+    List the cases that got slower than the baseline.
+
+    :param current: The results of the new run
+    :param baseline: The results to compare against
+    :param threshold: The allowed slowdown, 0.25 for 25%
+    :param min_delta: Slowdowns below this many milliseconds are timer noise
+    :return: A list of report lines, one per regression
+    """
+    regressions = []
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        for stat in ("p50", "p95"):
+            old, new = baseline[name][stat], stats[stat]
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(f"{name} {stat}: {old:.3f} ms -> {new:.3f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results):
+    """
+    Print one line of statistics per case.
+    """
+    for name, stats in results.items():
+        print(
+            f"{name:28} p50 {stats['p50']:9.3f}  p95 {stats['p95']:9.3f}  "
+            f"p99 {stats['p99']:9.3f}  max {stats['max']:9.3f} ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the suite and write the results")
+    run.add_argument("--runs", type=int, default=100)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("-o", "--output", default="-", help="results file, default stdout")
+    check = commands.add_parser("compare", help="compare results against the baseline")
+    check.add_argument("results")
+    check.add_argument("--baseline", default=BASELINE)
+    check.add_argument("--threshold", type=float, default=0.25)
+    check.add_argument("--min-delta", type=float, default=0.05, help="ignore slowdowns below this many ms")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "runs": args.runs,
+            "seed": args.seed,
+            "max_steps": MAX_STEPS,
+            "results": run_suite(args.runs, args.seed),
+        }
+        text = json.dumps(report, indent=2)
+        if args.output == "-":
+            print(text)
+        else:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+            print_table(report["results"])
+        return 0
+
+    with open(args.results) as f:
+        current = json.load(f)["results"]
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    print_table(current)
+    regressions = compare(current, baseline, args.threshold, args.min_delta)
+    for line in regressions:
+        print("REGRESSION", line)
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import math
+from itertools import permutations, product
+
+# largest grid canonicalised, (SRN!)^(SRN + 1) column orders are tried up front
+MAX_CANONICAL_SIZE = 9
+
+_column_orders = {}
+
+
+def _orders(N):
+    """
+    Return every column order that keeps stacks together, cached per size.
+
+    :param N: The size of the grid
+    :return: A list of tuples of column indices
+    """
+    if N not in _column_orders:
+        SRN = int(math.sqrt(N))
+        inner = list(permutations(range(SRN)))
+        orders = []
+        for stacks in permutations(range(SRN)):
+            for offsets in product(inner, repeat=SRN):
+                orders.append(tuple(
+                    stack * SRN + offset
+                    for stack, stack_offsets in zip(stacks, offsets)
+                    for offset in stack_offsets
+                ))
+        _column_orders[N] = orders
+    return _column_orders[N]
+
+
+def canonical_form(grid):
+    """
+    Return the lexicographically smallest grid equivalent to a grid under the
+    Sudoku symmetry group.
+
+    The group is generated by transposition, band and stack permutations,
+    row and column permutations within a band or stack, and relabeling of
+    the numbers 1..N. Two grids are equivalent exactly when their canonical
+    forms are equal. Rows are compared in order and empty cells (0) sort
+    before any number.
+
+    The search builds the result one row at a time. Every candidate is a
+    choice of orientation and column order plus the rows placed so far, and
+    only the candidates whose rows match the smallest prefix found are kept
+    for the next row. For a fixed arrangement of cells, numbering the numbers
+    in order of first appearance is the smallest relabeling, so it is carried
+    along with each candidate. The number of column orders grows as
+    (SRN!)^(SRN + 1), which keeps this practical up to 9x9 only.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: A tuple of N tuples
+    :raises ValueError: If the grid is larger than MAX_CANONICAL_SIZE
+    """
+    N = len(grid)
+    if N > MAX_CANONICAL_SIZE:
+        raise ValueError(
+            f"canonical forms are only supported up to {MAX_CANONICAL_SIZE}x{MAX_CANONICAL_SIZE}, got {N}x{N}"
+        )
+    SRN = int(math.sqrt(N))
+    views = (grid, [list(line) for line in zip(*grid)])
+    empty = [0] * (N + 1)
+    # (view, column order, rows used, label of each number, next label)
+    frontier = [(view, cols, (), empty, 1) for view in views for cols in _orders(N)]
+    result = []
+    for position in range(N):
+        best = None
+        survivors = []
+        for view, cols, rows, labels, next_label in frontier:
+            if position % SRN:
+                band = rows[-1] // SRN
+                candidates = [row for row in range(band * SRN, band * SRN + SRN) if row not in rows]
+            else:
+                used_bands = {row // SRN for row in rows}
+                candidates = [row for row in range(N) if row // SRN not in used_bands]
+            for row in candidates:
+                line = view[row]
+                out = []
+                new_labels = labels
+                label = next_label
+                # compare against the best row while building it, bailing out early
+                tied = best is not None
+                worse = False
+                for col in cols:
+                    num = line[col]
+                    if num:
+                        value = new_labels[num]
+                        if not value:
+                            if new_labels is labels:
+                                new_labels = labels[:]
+                            value = new_labels[num] = label
+                            label += 1
+                    else:
+                        value = 0
+                    if tied:
+                        target = best[len(out)]
+                        if value > target:
+                            worse = True
+                            break
+                        if value < target:
+                            tied = False
+                            survivors = []
+                    out.append(value)
+                if worse:
+                    continue
+                if not tied:
+                    best = out
+                survivors.append((view, cols, rows + (row,), new_labels, label))
+        result.append(tuple(best))
+        frontier = survivors
+    return tuple(result)
+
+
+def canonical_key(grid):
+    """
+    Return a compact hashable key of a grid's canonical form.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: The canonical form as bytes, one byte per cell
+    """
+    return bytes(value for line in canonical_form(grid) for value in line)
+
+
+class PuzzleIndex:
+    def __init__(self):
+        """
+        A set of puzzles that also recognises transformed duplicates.
+
+        Puzzles are stored by their canonical key, so checking or inserting a
+        puzzle is one canonicalisation and one hash lookup, whatever the size
+        of the collection.
+
+        :return: None
+        """
+        self.keys = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, grid):
+        return canonical_key(grid) in self.keys
+
+    def add(self, grid):
+        """
+        Insert a puzzle unless an equivalent one is already indexed.
+
+        :param grid: A list of N lists of N ints, 0 for an empty cell
+        :return: The insertion number of the puzzle, or of the equivalent
+            puzzle already in the index, and whether the puzzle was new
+        """
+        key = canonical_key(grid)
+        if key in self.keys:
+            return self.keys[key], False
+        self.keys[key] = len(self.keys)
+        return self.keys[key], True
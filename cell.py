@@ -1,5 +1,5 @@
 import pygame
-from settings import convert_list
+from render_cache import glyph, notes
 
 pygame.font.init()
 
@@ -34,11 +34,12 @@ class Cell:
         self.abs_y = col * self.height
         self.value = value
         self.is_correct_guess = is_correct_guess
-        self.guesses = None if self.value != 0 else [0 for x in range(9)]
+        # the player's notes, bit d - 1 set for the number d, None for a filled cell
+        self.guesses = None if self.value != 0 else 0
         self.color = pygame.Color("white")
-        self.font = pygame.font.SysFont('monospace', self.cell_size[0])
-        self.g_font = pygame.font.SysFont('monospace', (cell_size[0] // 3))
         self.rect = pygame.Rect(self.abs_x,self.abs_y,self.width,self.height)
+        # set when the cell changes and has to be redrawn, see Table.update
+        self.dirty = True
 
     def update(self, screen, SRN = None):
         """
@@ -51,20 +52,12 @@ class Cell:
         SRN : int
             The size of the sub-region network (SRN) grid.
         """
+        if self.value == 0 and self.guesses != None:
+            # the background and notes come composed, one blit for the whole cell
+            screen.blit(notes(self.guesses, SRN, self.cell_size, self.color), (self.abs_x, self.abs_y))
+            return
         pygame.draw.rect(screen, self.color, self.rect)
         if self.value != 0:
             font_color = pygame.Color("black") if self.is_correct_guess else pygame.Color("red")
-            num_val = self.font.render(str(self.value), True, font_color)
+            num_val = glyph("monospace", self.cell_size[0], str(self.value), font_color)
             screen.blit(num_val, (self.abs_x, self.abs_y))
-        elif self.value == 0 and self.guesses != None:
-            cv_list = convert_list(self.guesses, [SRN, SRN, SRN])
-            for y in range(SRN):
-                for x in range(SRN):
-                    num_txt = " "
-                    if cv_list[y][x] != 0:
-                        num_txt = cv_list[y][x]
-                    num_txt = self.g_font.render(str(num_txt), True, pygame.Color("orange"))
-                    abs_x = (self.abs_x + ((self.width // SRN) * x))
-                    abs_y = (self.abs_y + ((self.height // SRN) * y))
-                    abs_pos = (abs_x, abs_y)
-                    screen.blit(num_txt, abs_pos)
\ No newline at end of file
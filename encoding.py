@@ -0,0 +1,169 @@
+import math
+from array import array
+
+# translation tables splitting a byte into its high and low nibble
+_HIGH = bytes(byte >> 4 for byte in range(256))
+_LOW = bytes(byte & 0x0F for byte in range(256))
+_DIGITS = b"0123456789"
+
+
+def _size(cells):
+    """
+    Return the grid size N of a flat list of N * N cells.
+
+    :param cells: The number of cells
+    :return: The grid size
+    """
+    N = math.isqrt(cells)
+    if N * N != cells:
+        raise ValueError(f"{cells} cells do not make a square grid")
+    return N
+
+
+def to_cells(grid):
+    """
+    Flatten a table into an array of one byte per cell, in row order.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: An array('B') of N * N cells
+    """
+    cells = array("B")
+    for line in grid:
+        cells.extend(line)
+    return cells
+
+
+def from_cells(cells):
+    """
+    Rebuild a table from a flat sequence of cells, in row order.
+
+    :param cells: A sequence of N * N ints, such as an array('B') or bytes
+    :return: A list of N lists of N ints
+    """
+    N = _size(len(cells))
+    return [list(cells[row * N:(row + 1) * N]) for row in range(N)]
+
+
+def to_string(grid):
+    """
+    Encode a 9x9 (or smaller) table as one character per cell, in row order.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: A string of N * N digits, "0" for an empty cell
+    """
+    if len(grid) > 9:
+        raise ValueError("the string form only holds grids up to 9x9")
+    return "".join(str(value) for line in grid for value in line)
+
+
+def from_string(text):
+    """
+    Decode a table from its string form, see `to_string`.
+
+    :param text: A string of N * N digits, "0" or "." for an empty cell
+    :return: A list of N lists of N ints
+    :raises ValueError: If the text holds anything but digits and "."
+    """
+    data = text.replace(".", "0").encode("ascii", "replace")
+    if data.translate(None, _DIGITS):
+        raise ValueError("the string form only holds the digits 0-9 and '.'")
+    return from_cells(data.translate(_LOW))
+
+
+def pack_nibbles(grid):
+    """
+    Pack a 9x9 (or smaller) table into 4 bits per cell, two cells per byte.
+
+    A 9x9 table takes 41 bytes, the low nibble of the last byte is padding.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: The packed bytes
+    """
+    cells = to_cells(grid)
+    if len(grid) > 15:
+        raise ValueError("nibble packing only holds grids up to 15x15")
+    if len(cells) % 2:
+        cells.append(0)
+    return bytes(
+        high << 4 | low for high, low in zip(cells[0::2], cells[1::2])
+    )
+
+
+def unpack_nibbles_into(data, out):
+    """
+    Decode nibble-packed cells straight into a preallocated array.
+
+    The nibbles are split with two table translations and written through
+    slice assignment, so no per-cell Python code runs.
+
+    :param data: Bytes produced by `pack_nibbles`
+    :param out: An array('B') of N * N cells to write into
+    :return: out
+    """
+    high = len(out) - len(out) // 2
+    out[0::2] = array("B", data[:high].translate(_HIGH))
+    out[1::2] = array("B", data[:len(out) // 2].translate(_LOW))
+    return out
+
+
+def unpack_nibbles(data, N=9):
+    """
+    Decode a nibble-packed table, see `pack_nibbles`.
+
+    :param data: The packed bytes
+    :param N: The grid size
+    :return: A list of N lists of N ints
+    """
+    return from_cells(unpack_nibbles_into(data, array("B", bytes(N * N))))
+
+
+def pack_bits(grid):
+    """
+    Pack a table of up to 64x64 into N.bit_length() bits per cell.
+
+    Cells are written most significant first and the result is padded to
+    whole bytes, so a 16x16 table takes 160 bytes and a 25x25 one 391.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: The packed bytes
+    """
+    N = len(grid)
+    if N > 64:
+        raise ValueError("bit packing only holds grids up to 64x64")
+    width = N.bit_length()
+    value = 0
+    for line in grid:
+        for cell in line:
+            value = value << width | cell
+    bits = N * N * width
+    padding = -bits % 8
+    return (value << padding).to_bytes((bits + padding) // 8, "big")
+
+
+def unpack_bits_into(data, N, out):
+    """
+    Decode bit-packed cells straight into a preallocated array.
+
+    :param data: Bytes produced by `pack_bits`
+    :param N: The grid size
+    :param out: An array('B') of N * N cells to write into
+    :return: out
+    """
+    width = N.bit_length()
+    mask = (1 << width) - 1
+    value = int.from_bytes(data, "big") >> (-(N * N * width) % 8)
+    for idx in range(N * N - 1, -1, -1):
+        out[idx] = value & mask
+        value >>= width
+    return out
+
+
+def unpack_bits(data, N):
+    """
+    Decode a bit-packed table, see `pack_bits`.
+
+    :param data: The packed bytes
+    :param N: The grid size
+    :return: A list of N lists of N ints
+    """
+    return from_cells(unpack_bits_into(data, N, array("B", bytes(N * N))))
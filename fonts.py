@@ -0,0 +1,37 @@
+import time
+
+import pygame
+
+pygame.font.init()
+
+# loaded fonts by (name, size)
+_fonts = {}
+# how many fonts were actually loaded, and the seconds spent loading them
+loads = 0
+load_time = 0.0
+
+
+def get_font(name, size):
+    """
+    Gets a system font, loading it only the first time it is asked for.
+
+    `pygame.font.SysFont` looks the name up among the system fonts, which on
+    Linux means a font scan on first use and a file load every time. All the
+    cells, the clock and the menus share fonts through this registry instead,
+    so each (name, size) is loaded once per process.
+
+    Args:
+        name (str): The system font name, as passed to `pygame.font.SysFont`.
+        size (int): The size of the font.
+
+    Returns:
+        pygame.font.Font: The font.
+    """
+    global loads, load_time
+    font = _fonts.get((name, size))
+    if font is None:
+        start = time.perf_counter()
+        font = _fonts[(name, size)] = pygame.font.SysFont(name, size)
+        load_time += time.perf_counter() - start
+        loads += 1
+    return font
@@ -0,0 +1,229 @@
+import math
+import time
+
+_peer_lists = {}
+
+
+def _peers(N):
+    """
+    Lists the cells sharing a row, column or subgroup with each cell, cached per size.
+
+    Args:
+        N (int): The size of the board.
+
+    Returns:
+        list: peers[row][col] is a list of the (row, col) positions of its 20 peers
+        on a 9x9 board.
+    """
+    if N not in _peer_lists:
+        SRN = int(math.sqrt(N))
+        peers = [[None] * N for _ in range(N)]
+        for row in range(N):
+            for col in range(N):
+                rowstart, colstart = row - row % SRN, col - col % SRN
+                group = {(row, other) for other in range(N)}
+                group.update((other, col) for other in range(N))
+                group.update(
+                    (rowstart + x, colstart + y) for x in range(SRN) for y in range(SRN)
+                )
+                group.discard((row, col))
+                peers[row][col] = sorted(group)
+        _peer_lists[N] = peers
+    return _peer_lists[N]
+
+
+class GameState:
+    def __init__(self, puzzle, answers, lives=3, timer=time.time):
+        """
+        The rules and state of one game, without any drawing.
+
+        Nothing here touches pygame, so whole games can be played out and checked at
+        CPU speed. The board, the notes and the answers are indexed [row][col]. Each
+        action returns the positions whose value or notes it changed, which is what a
+        view has to redraw.
+
+        Args:
+            puzzle (list): The puzzle, N lists of N ints with 0 for an empty cell.
+            answers (list): The solution of the puzzle.
+            lives (int): How many wrong numbers the player may place.
+            timer (callable): Returns the current time in seconds, for the game clock.
+        """
+        self.N = len(puzzle)
+        self.board = [line[:] for line in puzzle]
+        self.answers = answers
+        # bit d - 1 is set when d is noted, None for a filled cell
+        self.notes = [[None if value else 0 for value in line] for line in puzzle]
+        self.peers = _peers(self.N)
+        self.lives = lives
+        self.guess_mode = True
+        self.game_over = False
+        # progress: how many cells hold their answer, kept up to date by every move
+        self.correct_cells = sum(
+            value == answer
+            for line, answer_line in zip(self.board, answers)
+            for value, answer in zip(line, answer_line)
+        )
+        self.total_cells = self.N * self.N
+        self.timer = timer
+        self.start_time = timer()
+        self.end_time = None
+
+    def elapsed(self):
+        """
+        Gets the time on the game clock, which stops when the game is over.
+
+        Returns:
+            float: The seconds since the game started.
+        """
+        return (self.end_time if self.end_time is not None else self.timer()) - self.start_time
+
+    def progress(self):
+        """
+        Gets how far the puzzle is from being solved.
+
+        Returns:
+            float: The share of cells holding their answer, 1.0 once solved.
+        """
+        return self.correct_cells / self.total_cells
+
+    def solved(self):
+        """
+        Checks if the puzzle has been solved correctly.
+
+        Returns:
+            bool: True once every cell holds its answer.
+        """
+        return self.correct_cells == self.total_cells
+
+    def is_wrong(self, row, col):
+        """
+        Checks if a cell holds a number other than its answer.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            bool: True for a wrong number the player may erase.
+        """
+        return self.board[row][col] != 0 and self.board[row][col] != self.answers[row][col]
+
+    def has_note(self, row, col, num):
+        """
+        Checks if a number is in the notes of a cell.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+            num (int): The number to check, from 1 to N.
+
+        Returns:
+            bool: True if the cell is empty and has the number noted.
+        """
+        mask = self.notes[row][col]
+        return mask is not None and (mask >> (num - 1)) & 1 == 1
+
+    def set_note(self, row, col, num):
+        """
+        Adds a number to the notes of an empty cell, without checking the rules.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+            num (int): The number to note, from 1 to N.
+        """
+        self.notes[row][col] |= 1 << (num - 1)
+
+    def clear_note(self, row, col, num):
+        """
+        Removes a number from the notes of an empty cell.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+            num (int): The number to remove, from 1 to N.
+        """
+        self.notes[row][col] &= ~(1 << (num - 1))
+
+    def toggle_mode(self):
+        """Switches between noting guesses and placing numbers."""
+        self.guess_mode = not self.guess_mode
+
+    def _set_value(self, row, col, value):
+        answer = self.answers[row][col]
+        self.correct_cells += (value == answer) - (self.board[row][col] == answer)
+        self.board[row][col] = value
+
+    def _check_over(self):
+        if self.solved() or self.lives <= 0:
+            self.game_over = True
+            self.end_time = self.timer()
+
+    def note(self, row, col, num):
+        """
+        Adds a number to the notes of an empty cell.
+
+        The number is only noted if no peer of the cell already holds it.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+            num (int): The number to note.
+
+        Returns:
+            list: The positions that changed.
+        """
+        if self.game_over or self.board[row][col] != 0 or self.notes[row][col] is None:
+            return []
+        for peer_row, peer_col in self.peers[row][col]:
+            if self.board[peer_row][peer_col] == num:
+                return []
+        self.set_note(row, col, num)
+        return [(row, col)]
+
+    def place(self, row, col, num):
+        """
+        Places a number in an empty cell.
+
+        A right number clears the cell's notes and removes the number from the notes
+        of its peers. A wrong number costs a life and stays until it is erased.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+            num (int): The number to place.
+
+        Returns:
+            list: The positions that changed.
+        """
+        if self.game_over or self.board[row][col] != 0:
+            return []
+        self._set_value(row, col, num)
+        changed = [(row, col)]
+        if num == self.answers[row][col]:
+            self.notes[row][col] = None
+            for peer_row, peer_col in self.peers[row][col]:
+                if self.has_note(peer_row, peer_col, num):
+                    self.clear_note(peer_row, peer_col, num)
+                    changed.append((peer_row, peer_col))
+        else:
+            self.notes[row][col] = 0
+            self.lives -= 1
+        self._check_over()
+        return changed
+
+    def erase(self, row, col):
+        """
+        Empties a cell holding a wrong number.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            list: The positions that changed.
+        """
+        if self.game_over or not self.is_wrong(row, col):
+            return []
+        self._set_value(row, col, 0)
+        return [(row, col)]
@@ -0,0 +1,417 @@
+import math
+from itertools import combinations
+
+# techniques in the order they are tried, with the score of one use
+TECHNIQUES = (
+    ("naked_single", 1),
+    ("hidden_single", 2),
+    ("locked_candidates", 8),
+    ("naked_pair", 15),
+    ("hidden_pair", 20),
+    ("naked_triple", 25),
+    ("hidden_triple", 30),
+    ("x_wing", 40),
+    ("swordfish", 60),
+)
+WEIGHTS = dict(TECHNIQUES)
+
+_layouts = {}
+
+
+def _layout(N):
+    """
+    Return the units and peers of an N x N grid, cached per size.
+
+    Cells are numbered 0..N*N-1 in row order. The units are the N rows, then
+    the N columns, then the N subgroups.
+
+    Crossings pair each subgroup with the rows and the columns through it,
+    and each row and column with the subgroups along it. Every crossing lists,
+    per line, the cells the two units share and the cells of the line outside
+    the unit, which is what locked candidates needs.
+
+    :param N: The size of the grid
+    :return: A (units, peers, unit_of, crossings) tuple, where unit_of[cell]
+        holds the row, column and subgroup unit indices of the cell
+    """
+    if N not in _layouts:
+        SRN = int(math.sqrt(N))
+        rows = [[row * N + col for col in range(N)] for row in range(N)]
+        cols = [[row * N + col for row in range(N)] for col in range(N)]
+        boxes = [
+            [(band * SRN + x) * N + stack * SRN + y for x in range(SRN) for y in range(SRN)]
+            for band in range(SRN) for stack in range(SRN)
+        ]
+        units = rows + cols + boxes
+        unit_of = [
+            (cell // N, N + cell % N, 2 * N + (cell // N // SRN) * SRN + cell % N // SRN)
+            for cell in range(N * N)
+        ]
+        peers = [
+            sorted({peer for unit in unit_of[cell] for peer in units[unit]} - {cell})
+            for cell in range(N * N)
+        ]
+        crossings = []
+        for unit in range(3 * N):
+            kinds = (0, 1) if unit >= 2 * N else (2,)
+            for kind in kinds:
+                lines = sorted({unit_of[cell][kind] for cell in units[unit]})
+                crossings.append((unit, [
+                    (
+                        [cell for cell in units[unit] if unit_of[cell][kind] == line],
+                        [cell for cell in units[line] if unit not in unit_of[cell]],
+                    )
+                    for line in lines
+                ]))
+        _layouts[N] = (units, peers, unit_of, crossings)
+    return _layouts[N]
+
+
+class Grade:
+    def __init__(self, solved, counts):
+        """
+        The outcome of grading a puzzle.
+
+        :param solved: Whether the techniques alone solved the puzzle
+        :param counts: How many times each technique made progress
+        :return: None
+        """
+        self.solved = solved
+        self.counts = counts
+        self.score = sum(WEIGHTS[name] * uses for name, uses in counts.items())
+        used = [name for name, _ in TECHNIQUES if counts.get(name)]
+        self.hardest = used[-1] if used else None
+
+    def requires(self, technique):
+        """
+        Check whether a puzzle needed a technique, or a harder one.
+
+        :param technique: The name of a technique in TECHNIQUES
+        :return: True if the hardest technique used is at least as hard
+        """
+        order = [name for name, _ in TECHNIQUES]
+        return self.hardest is not None and order.index(self.hardest) >= order.index(technique)
+
+    def __repr__(self):
+        return f"Grade(solved={self.solved}, score={self.score}, hardest={self.hardest}, counts={self.counts})"
+
+
+class Band:
+    def __init__(self, easiest=None, hardest=None, min_score=0, max_score=None, needs=()):
+        """
+        A difficulty band that grades can fall into.
+
+        A puzzle is in the band if logic alone solves it, its hardest
+        technique is between `easiest` and `hardest`, it uses every technique
+        in `needs` at least once and its score is between `min_score` and
+        `max_score`.
+
+        :param easiest: The easiest technique the puzzle must need, or None
+        :param hardest: The hardest technique the puzzle may need, or None
+        :param min_score: The lowest score allowed
+        :param max_score: The highest score allowed, or None
+        :param needs: Techniques the puzzle must use at least once
+        :return: None
+        """
+        self.needs = tuple(needs)
+        self.easiest = easiest
+        self.hardest = hardest
+        self.min_score = min_score
+        self.max_score = max_score
+
+    def too_hard(self, grade):
+        """
+        Check whether a grade is above the band.
+
+        :param grade: A `Grade`
+        :return: True if digging further can only keep it out of the band
+        """
+        if not grade.solved:
+            return True
+        if self.hardest is not None and grade.requires(self.hardest) and grade.hardest != self.hardest:
+            return True
+        return self.max_score is not None and grade.score > self.max_score
+
+    def too_easy(self, grade):
+        """
+        Check whether a grade is below the band.
+
+        :param grade: A `Grade`
+        :return: True if the puzzle is too easy for the band
+        """
+        if self.easiest is not None and not grade.requires(self.easiest):
+            return True
+        if any(not grade.counts.get(technique) for technique in self.needs):
+            return True
+        return grade.score < self.min_score
+
+    def contains(self, grade):
+        """
+        Check whether a grade is in the band.
+
+        :param grade: A `Grade`
+        :return: True if it is neither too easy nor too hard
+        """
+        return not self.too_hard(grade) and not self.too_easy(grade)
+
+
+# named bands for difficulty-tiered puzzle banks
+BANDS = {
+    "easy": Band(hardest="hidden_single"),
+    "medium": Band(easiest="locked_candidates", hardest="hidden_pair"),
+    "hard": Band(easiest="naked_triple", hardest="swordfish"),
+    "x_wing": Band(needs=("x_wing",)),
+}
+
+
+class LogicSolver:
+    def __init__(self, grid):
+        """
+        Set up candidate bitmasks for a puzzle.
+
+        Bit d - 1 of a cell's mask stands for the number d. Masks are only
+        ever narrowed in place, when a number is placed or a technique
+        eliminates candidates, so no step rescans the grid to rebuild them.
+
+        :param grid: A list of N lists of N ints, 0 for an empty cell
+        :return: None
+        """
+        self.N = N = len(grid)
+        self.units, self.peers, self.unit_of, self.crossings = _layout(N)
+        self.values = [0] * (N * N)
+        self.cands = [(1 << N) - 1] * (N * N)
+        self.counts = {}
+        self.broken = False
+        # cells whose mask went down to one candidate
+        self.singles = []
+        for row in range(N):
+            for col in range(N):
+                if grid[row][col]:
+                    self.place(row * N + col, grid[row][col])
+        # the givens may already leave cells with a single candidate
+        self.singles = [
+            cell for cell in range(N * N)
+            if self.values[cell] == 0 and self.cands[cell].bit_count() == 1
+        ]
+
+    def place(self, cell, num):
+        """
+        Fill a cell and remove its number from the candidates of its peers.
+
+        :param cell: The index of the cell
+        :param num: The number to place
+        :return: None
+        """
+        if self.cands[cell] & (1 << (num - 1)) == 0:
+            self.broken = True
+            return
+        self.values[cell] = num
+        self.cands[cell] = 0
+        bit = 1 << (num - 1)
+        for peer in self.peers[cell]:
+            if self.cands[peer] & bit:
+                self.eliminate(peer, bit)
+
+    def eliminate(self, cell, mask):
+        """
+        Remove candidates from a cell.
+
+        :param cell: The index of the cell
+        :param mask: The candidates to remove
+        :return: True if the cell lost any candidate
+        """
+        old = self.cands[cell]
+        new = old & ~mask
+        if new == old:
+            return False
+        self.cands[cell] = new
+        if new == 0:
+            self.broken = True
+        elif new & (new - 1) == 0:
+            self.singles.append(cell)
+        return True
+
+    def _use(self, technique):
+        self.counts[technique] = self.counts.get(technique, 0) + 1
+
+    def solve(self):
+        """
+        Apply the techniques, cheapest first, until the puzzle is solved or
+        none of them makes progress.
+
+        After every successful step the search goes back to the cheapest
+        technique, so each use counted was really needed.
+
+        :return: A `Grade`
+        """
+        steps = (
+            self._locked_candidates,
+            lambda: self._naked_subset(2, "naked_pair"),
+            lambda: self._hidden_subset(2, "hidden_pair"),
+            lambda: self._naked_subset(3, "naked_triple"),
+            lambda: self._hidden_subset(3, "hidden_triple"),
+            lambda: self._fish(2, "x_wing"),
+            lambda: self._fish(3, "swordfish"),
+        )
+        while not self.broken:
+            if self._naked_singles() or self._hidden_singles():
+                continue
+            if 0 not in self.values:
+                break
+            if not any(step() for step in steps):
+                break
+        return Grade(not self.broken and 0 not in self.values, self.counts)
+
+    def _naked_singles(self):
+        progress = False
+        while self.singles and not self.broken:
+            cell = self.singles.pop()
+            mask = self.cands[cell]
+            if self.values[cell] == 0 and mask:
+                self.place(cell, mask.bit_length())
+                self._use("naked_single")
+                progress = True
+        return progress
+
+    def _hidden_singles(self):
+        cands, values = self.cands, self.values
+        progress = False
+        for unit in self.units:
+            once = twice = placed = 0
+            for cell in unit:
+                mask = cands[cell]
+                twice |= once & mask
+                once |= mask
+                if values[cell]:
+                    placed |= 1 << (values[cell] - 1)
+            lonely = once & ~twice & ~placed
+            while lonely:
+                bit = lonely & -lonely
+                lonely ^= bit
+                for cell in unit:
+                    if cands[cell] & bit:
+                        self.place(cell, bit.bit_length())
+                        self._use("hidden_single")
+                        progress = True
+                        break
+                else:
+                    # an earlier placement of this pass took the number's only cell
+                    self.broken = True
+                    return progress
+        return progress
+
+    def _locked_candidates(self):
+        cands = self.cands
+        # pointing: a subgroup's candidates for a number all lie on one row
+        # or column; claiming: a row's or column's candidates all lie in one
+        # subgroup. Either way the number goes from the rest of the other unit.
+        for unit, segments in self.crossings:
+            masks = []
+            for shared, _ in segments:
+                mask = 0
+                for cell in shared:
+                    mask |= cands[cell]
+                masks.append(mask)
+            for idx, (_, outside) in enumerate(segments):
+                others = 0
+                for other_idx, mask in enumerate(masks):
+                    if other_idx != idx:
+                        others |= mask
+                confined = masks[idx] & ~others
+                progress = False
+                for cell in outside:
+                    if cands[cell] & confined:
+                        progress |= self.eliminate(cell, confined)
+                if progress:
+                    self._use("locked_candidates")
+                    return True
+        return False
+
+    def _naked_subset(self, size, technique):
+        cands = self.cands
+        for unit in self.units:
+            open_cells = [cell for cell in unit if 2 <= cands[cell].bit_count() <= size]
+            for group in combinations(open_cells, size):
+                union = 0
+                for cell in group:
+                    union |= cands[cell]
+                if union.bit_count() != size:
+                    continue
+                progress = False
+                for cell in unit:
+                    if cell not in group and cands[cell] & union:
+                        progress |= self.eliminate(cell, union)
+                if progress:
+                    self._use(technique)
+                    return True
+        return False
+
+    def _hidden_subset(self, size, technique):
+        N, cands = self.N, self.cands
+        for unit in self.units:
+            # where[num] has bit idx set if unit[idx] may hold num + 1
+            where = [0] * N
+            for idx, cell in enumerate(unit):
+                mask = cands[cell]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    where[bit.bit_length() - 1] |= 1 << idx
+            spots = [num for num in range(N) if 2 <= where[num].bit_count() <= size]
+            for nums in combinations(spots, size):
+                places = 0
+                keep = 0
+                for num in nums:
+                    places |= where[num]
+                    keep |= 1 << num
+                if places.bit_count() != size:
+                    continue
+                progress = False
+                for idx, cell in enumerate(unit):
+                    if places >> idx & 1:
+                        progress |= self.eliminate(cell, ~keep)
+                if progress:
+                    self._use(technique)
+                    return True
+        return False
+
+    def _fish(self, size, technique):
+        N, cands, units = self.N, self.cands, self.units
+        for bit in (1 << d for d in range(N)):
+            # base lines are rows and cover lines columns, then the reverse
+            for base, cover in ((0, N), (N, 0)):
+                lines = {}
+                for line in range(N):
+                    where = 0
+                    for idx, cell in enumerate(units[base + line]):
+                        if cands[cell] & bit:
+                            where |= 1 << idx
+                    if 2 <= where.bit_count() <= size:
+                        lines[line] = where
+                for group in combinations(lines, size):
+                    covered = 0
+                    for line in group:
+                        covered |= lines[line]
+                    if covered.bit_count() != size:
+                        continue
+                    progress = False
+                    for idx in range(N):
+                        if covered >> idx & 1:
+                            for pos, cell in enumerate(units[cover + idx]):
+                                if pos not in group:
+                                    progress |= self.eliminate(cell, bit)
+                    if progress:
+                        self._use(technique)
+                        return True
+        return False
+
+
+def grade(grid):
+    """
+    Grade a puzzle by the human solving techniques it needs.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell, such as
+        `Sudoku.answerable_table`
+    :return: A `Grade` with the score and per-technique usage counts
+    """
+    return LogicSolver(grid).solve()
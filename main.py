@@ -1,13 +1,17 @@
-import pygame, sys
-from settings import WIDTH, HEIGHT, CELL_SIZE
-from table import Table
+import time
 
-pygame.init()
+# taken before pygame loads, so time-to-first-frame covers the whole startup
+LAUNCH_TIME = time.perf_counter()
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT + (CELL_SIZE[1] * 3)))
-pygame.display.set_caption("Sudoku")
+import pygame, sys
+from settings import WIDTH, HEIGHT, CELL_SIZE, BANK_PATH
+from table import Table
+from puzzle_queue import PuzzleQueue
+import render_cache
+import fonts
 
-pygame.font.init()
+# fired once a second while idle, to move the game clock on
+CLOCK_TICK = pygame.USEREVENT
 
 
 class Main:
@@ -17,14 +21,115 @@ class Main:
         Args:
             screen (pygame.Surface): The surface to draw onto
 
-        Sets up the main game class with the given screen, and sets up a few fonts
-        and a colour for use later.
+        Sets up the main game class with the given screen, and sets up a colour for
+        use later.
         """
         self.screen = screen
         self.FPS = pygame.time.Clock()
-        self.lives_font = pygame.font.SysFont("comicsans", CELL_SIZE[0] // 2)
-        self.message_font = pygame.font.SysFont("comicsans", CELL_SIZE[0])
         self.color = pygame.Color("darkblue")
+        # every puzzle, the first one included, comes from the pre-warmed queue
+        self.puzzles = PuzzleQueue(bank_path=BANK_PATH)
+        # the lives left or the game over message
+        self.status_rect = pygame.Rect(0, HEIGHT + (CELL_SIZE[1] * 2), WIDTH, CELL_SIZE[1])
+        self.pixels_pushed = 0
+        self.total_pixels = 0
+        self.frames = 0
+        self.focused = True
+        self.minimized = False
+        # wall-clock and CPU seconds spent, and texts rendered, in each mode of the game loop
+        self.mode_times = {}
+
+    def _draw_loading(self):
+        """Draws the loading message shown until the puzzle is ready."""
+        message = render_cache.label("comicsans", CELL_SIZE[0], "Loading...", self.color)
+        self.screen.blit(
+            message,
+            (
+                (WIDTH - message.get_width()) // 2,
+                (HEIGHT - message.get_height()) // 2,
+            ),
+        )
+
+    def _draw_status(self, table):
+        """Draws the lives left, or whether the user has won or lost once the game is over.
+
+        Args:
+            table (Table): The game being played.
+        """
+        if not table.state.game_over:
+            my_lives = render_cache.label(
+                "comicsans", CELL_SIZE[0] // 2, f"Lives Left: {table.state.lives}", pygame.Color("black")
+            )
+            self.screen.blit(
+                my_lives,
+                (
+                    (WIDTH // table.SRN) - (CELL_SIZE[0] // 2),
+                    HEIGHT + (CELL_SIZE[1] * 2.2),
+                ),
+            )
+        else:
+            if table.state.lives <= 0:
+                message = render_cache.label(
+                    "comicsans", CELL_SIZE[0], "GAME OVER!!", pygame.Color("red")
+                )
+                self.screen.blit(
+                    message,
+                    (
+                        CELL_SIZE[0] + (CELL_SIZE[0] // 2),
+                        HEIGHT + (CELL_SIZE[1] * 2),
+                    ),
+                )
+            elif table.state.lives > 0:
+                message = render_cache.label(
+                    "comicsans", CELL_SIZE[0], "You Made It!!!", self.color
+                )
+                self.screen.blit(
+                    message, (CELL_SIZE[0], HEIGHT + (CELL_SIZE[1] * 2))
+                )
+
+    def _draw(self, table, rect):
+        """Redraws one rectangle of the screen from scratch.
+
+        Args:
+            table (Table): The game being played, or None while loading.
+            rect (pygame.Rect): The area of the screen to redraw.
+        """
+        self.screen.set_clip(rect)
+        if table is None:
+            self.screen.fill("gray")
+            self._draw_loading()
+        else:
+            table.draw_background(rect)
+            if rect.colliderect(self.status_rect):
+                self._draw_status(table)
+            table.draw(rect)
+        self.screen.set_clip(None)
+
+    def _mode(self, table, waiting):
+        """Picks how the game loop should wait for the next frame.
+
+        Args:
+            table (Table): The game being played, or None while loading.
+            waiting (bool): Whether a new game is waiting for a puzzle.
+
+        Returns:
+            str: "active" while a puzzle is loading, so the loop keeps polling at the
+            frame rate, otherwise "idle", "unfocused" or "minimized", in which it
+            sleeps until an event arrives.
+        """
+        if table is None or waiting:
+            return "active"
+        if self.minimized:
+            return "minimized"
+        return "idle" if self.focused else "unfocused"
+
+    def _report_modes(self):
+        """Prints the CPU time used and the texts rendered per wall-clock second in each mode of the game loop."""
+        for mode, (wall, cpu, renders) in self.mode_times.items():
+            print(
+                f"{mode}: {cpu * 1000 / max(wall, 1e-9):.1f} ms CPU and "
+                f"{renders / max(wall, 1e-9):.2f} renders per second over {wall:.1f} s"
+            )
 
     def main(self):
         """Runs the main game loop.
@@ -35,67 +140,140 @@ class Main:
         The game loop runs until the user closes the window, at which point it exits
         cleanly.
 
+        Puzzles are made ahead of time by the pre-warmed queue, so the window shows a
+        loading message from the very first frame until the first one arrives. The
+        time to the first frame and to the playable puzzle are printed once each.
+
+        Pressing N starts a new game with the next puzzle from the queue, so it is
+        normally instant. If the queue has run dry, the loading message shows until
+        the next puzzle arrives.
+
         The game loop consists of the following steps:
 
-        1. Fill the screen with gray to erase the old frame.
-        2. Handle any events that have occurred, such as the user clicking or pressing
+        1. Handle any events that have occurred, such as the user clicking or pressing
            a key.
-        3. If the user has clicked, handle the click by calling the
-           `handel_mouse_click` method of the `Table` class.
-        4. Draw the lives left on the screen.
-        5. If the game is over, draw a message on the screen indicating whether the
-           user has won or lost.
-        6. Update the display to show the new frame.
-        7. Cap the frame rate to prevent the game from running too fast.
+        2. If the user has clicked, handle the click by calling the
+           `handle_mouse_click` method of the `Table` class.
+        3. Update the game state with `Table.update`, which returns the parts of the
+           screen that changed. The lives left or the game over message are marked
+           changed when they differ from the last frame.
+        4. Redraw only the changed rectangles, or the whole screen when the puzzle or
+           the loading state has just changed. Nothing is drawn while minimized.
+        5. Push only those rectangles to the display and count the pixels pushed, so
+           a frame where nothing changed costs close to nothing.
+        6. Wait for the next frame. While a puzzle is loading the loop polls, capped at
+           30 frames per second. Otherwise it sleeps in `pygame.event.wait` until the
+           player does something or the once-a-second `CLOCK_TICK` timer moves the
+           game clock on. The timer is stopped while the window is minimized, so the
+           game then does no work at all until it is restored.
 
         The game loop continues until the user closes the window, at which point the
-        game exits cleanly.
+        game exits cleanly and prints the average number of pixels pushed per frame
+        and how many texts had to be rendered, with the notes cache hit rate and
+        memory use. The fonts loaded by then are the
+        fonts loaded at startup, since every later game reuses them. The CPU time used
+        and the texts rendered per wall-clock second in each mode of the loop are
+        printed as well.
         """
-        table = Table(self.screen)
+        table = None
+        first_frame = True
+        new_game_at = None
+        redraw = True
+        status = None
+        # nothing uses mouse motion, so it shouldn't wake the idle loop
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
         while True:
-            self.screen.fill("gray")
-            for event in pygame.event.get():
+            mode = self._mode(table, new_game_at is not None)
+            wall, cpu, renders = time.perf_counter(), time.process_time(), render_cache.renders
+            if mode == "active":
+                events = pygame.event.get()
+            else:
+                events = [pygame.event.wait()] + pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
+                    self.puzzles.close()
                     pygame.quit()
+                    print(f"{self.total_pixels / max(self.frames, 1):.0f} pixels pushed per frame over {self.frames} frames")
+                    print(f"{render_cache.renders} texts rendered over {self.frames} frames")
+                    stats = render_cache.notes_stats()
+                    print(
+                        f"notes cache: {stats['hit_rate'] * 100:.0f}% hits, {stats['entries']} cells "
+                        f"in {stats['bytes'] // 1024} of {stats['cap'] // 1024} KiB"
+                    )
+                    print(f"{fonts.loads} fonts loaded in {fonts.load_time * 1000:.0f} ms in total")
+                    self._report_modes()
                     sys.exit()
+                if event.type == pygame.WINDOWFOCUSLOST:
+                    self.focused = False
+                if event.type == pygame.WINDOWFOCUSGAINED:
+                    self.focused = True
+                if event.type == pygame.WINDOWMINIMIZED:
+                    self.minimized = True
+                    pygame.time.set_timer(CLOCK_TICK, 0)
+                if event.type == pygame.WINDOWRESTORED and self.minimized:
+                    self.minimized = False
+                    pygame.time.set_timer(CLOCK_TICK, 1000)
+                    redraw = True
+                if event.type == pygame.WINDOWEXPOSED:
+                    redraw = True
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_n:
+                    if table is not None:
+                        table = None
+                        new_game_at = time.perf_counter()
+                        redraw = True
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if not table.game_over:
+                    if table is not None and not table.state.game_over:
                         table.handle_mouse_click(event.pos)
-            if not table.game_over:
-                my_lives = self.lives_font.render(
-                    f"Lives Left: {table.lives}", True, pygame.Color("black")
-                )
-                self.screen.blit(
-                    my_lives,
-                    (
-                        (WIDTH // table.SRN) - (CELL_SIZE[0] // 2),
-                        HEIGHT + (CELL_SIZE[1] * 2.2),
-                    ),
-                )
-            else:
-                if table.lives <= 0:
-                    message = self.message_font.render(
-                        "GAME OVER!!", True, pygame.Color("red")
-                    )
-                    self.screen.blit(
-                        message,
-                        (
-                            CELL_SIZE[0] + (CELL_SIZE[0] // 2),
-                            HEIGHT + (CELL_SIZE[1] * 2),
-                        ),
-                    )
-                elif table.lives > 0:
-                    message = self.message_font.render(
-                        "You Made It!!!", True, self.color
-                    )
-                    self.screen.blit(
-                        message, (CELL_SIZE[0], HEIGHT + (CELL_SIZE[1] * 2))
-                    )
-            table.update()
-            pygame.display.flip()
-            self.FPS.tick(30)
+            if table is None:
+                puzzle = self.puzzles.get_nowait()
+                if puzzle is not None:
+                    table = Table(self.screen, puzzle=puzzle)
+                    redraw = True
+                    # restarted with each game, so the ticks line up with its clock
+                    pygame.time.set_timer(CLOCK_TICK, 0 if self.minimized else 1000)
+                    if new_game_at is None:
+                        print(f"puzzle ready {(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms after launch")
+                        print(f"{fonts.loads} fonts loaded in {fonts.load_time * 1000:.0f} ms at startup")
+                    else:
+                        print(f"new game ready in {(time.perf_counter() - new_game_at) * 1000:.0f} ms")
+                        new_game_at = None
+            rects = []
+            if table is not None:
+                rects = table.update()
+                if (table.state.lives, table.state.game_over) != status:
+                    status = (table.state.lives, table.state.game_over)
+                    rects.append(self.status_rect)
+            if self.minimized:
+                rects = []
+            elif redraw:
+                redraw = False
+                rects = [self.screen.get_rect()]
+            for rect in rects:
+                self._draw(table, rect)
+            if rects:
+                pygame.display.update(rects)
+            self.pixels_pushed = sum(rect.width * rect.height for rect in rects)
+            self.total_pixels += self.pixels_pushed
+            self.frames += 1
+            if first_frame:
+                first_frame = False
+                print(f"first frame {(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms after launch")
+            if mode == "active":
+                self.FPS.tick(30)
+            spent = self.mode_times.get(mode, (0.0, 0.0, 0))
+            self.mode_times[mode] = (
+                spent[0] + time.perf_counter() - wall,
+                spent[1] + time.process_time() - cpu,
+                spent[2] + render_cache.renders - renders,
+            )
 
 
 if __name__ == "__main__":
+    # set up the display only when run as a script, so importing this module
+    # opens no window
+    pygame.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT + (CELL_SIZE[1] * 3)))
+    pygame.display.set_caption("Sudoku")
     play = Main(screen)
     play.main()
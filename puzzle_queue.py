@@ -0,0 +1,123 @@
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+from bank import PuzzleBank
+from encoding import from_string, to_string
+from settings import N_CELLS, PREWARM_DEPTH
+from sudoku import Sudoku
+
+
+def new_puzzle(bank=None):
+    """
+    Draws a puzzle from a bank, or generates one if there is no usable bank.
+
+    This does not touch pygame, so it can run on a worker thread or process.
+
+    Args:
+        bank (PuzzleBank, optional): A bank of pre-generated puzzles.
+
+    Returns:
+        tuple: The puzzle table and its answer table.
+    """
+    if bank is not None and bank.N == N_CELLS and len(bank) > 0:
+        return bank.draw()
+    puzzle = Sudoku(N_CELLS, (N_CELLS * N_CELLS) // 2, unique=True)
+    return puzzle.puzzle_table(), puzzle.puzzle_answers()
+
+
+def _serve(bank_path):
+    """
+    Runs the refill worker: makes one puzzle for every line read from stdin.
+
+    Each puzzle is written back as one line holding the puzzle and its answers
+    in their string form, see `encoding.to_string`.
+
+    Args:
+        bank_path (str): The path of a puzzle bank, or None.
+    """
+    if hasattr(os, "nice"):
+        os.nice(10)
+    bank = PuzzleBank(bank_path) if bank_path and os.path.exists(bank_path) else None
+    for _ in sys.stdin:
+        puzzle, answers = new_puzzle(bank)
+        sys.stdout.write(f"{to_string(puzzle)} {to_string(answers)}\n")
+        sys.stdout.flush()
+
+
+class PuzzleQueue:
+    def __init__(self, depth=PREWARM_DEPTH, bank_path=None):
+        """
+        Keeps a bounded queue of ready puzzles, refilled in the background.
+
+        A daemon thread keeps the queue topped up to `depth` puzzles. The
+        puzzles themselves are made in a separate, lower-priority process, so
+        the refill thread spends its time blocked and never holds the GIL
+        long enough to cost the game loop a frame.
+
+        The worker runs this module as a script rather than through
+        multiprocessing, which would re-import the game's main script in it.
+        It only loads the generator, never pygame or the game modules, so the
+        first puzzle is ready soon after launch.
+
+        Args:
+            depth (int): The most puzzles kept ready.
+            bank_path (str, optional): A puzzle bank for the worker to draw from.
+        """
+        self.ready = queue.Queue(maxsize=depth)
+        self.closed = threading.Event()
+        self.worker = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)] + ([bank_path] if bank_path else []),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.thread = threading.Thread(target=self._refill, name="puzzle-refill", daemon=True)
+        self.thread.start()
+
+    def __len__(self):
+        return self.ready.qsize()
+
+    def _refill(self):
+        """Asks the worker for puzzles until the queue is closed, waiting while it is full."""
+        while not self.closed.is_set():
+            try:
+                self.worker.stdin.write("\n")
+                self.worker.stdin.flush()
+                line = self.worker.stdout.readline()
+            except (OSError, ValueError):
+                # the worker was stopped by close()
+                return
+            if not line:
+                return
+            puzzle, answers = line.split()
+            puzzle = (from_string(puzzle), from_string(answers))
+            while not self.closed.is_set():
+                try:
+                    self.ready.put(puzzle, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def get_nowait(self):
+        """
+        Takes a ready puzzle without waiting.
+
+        Returns:
+            tuple: A (puzzle, answers) pair, or None if none is ready yet.
+        """
+        try:
+            return self.ready.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stops the refill thread and the worker process."""
+        self.closed.set()
+        self.worker.terminate()
+
+
+if __name__ == "__main__":
+    _serve(sys.argv[1] if len(sys.argv) > 1 else None)
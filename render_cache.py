@@ -0,0 +1,162 @@
+from collections import OrderedDict
+
+import pygame
+
+from fonts import get_font
+from settings import LABEL_CACHE_SIZE, NOTES_CACHE_BYTES
+
+# rendered surfaces by (font name, size, text, colour)
+_glyphs = {}
+# how many times text was actually rendered, to check that the caches are working
+renders = 0
+
+# rendered HUD texts by (font name, size, text, colour), least recently used first
+_labels = OrderedDict()
+
+# composed notes surfaces by (notes mask, SRN, cell size, background), least
+# recently used first
+_notes = OrderedDict()
+_notes_bytes = 0
+_notes_hits = 0
+_notes_misses = 0
+
+
+def _render(name, size, text, color):
+    """
+    Renders a text, counting the render in `renders`.
+
+    When the display is set up, the surface is converted to its pixel format so
+    blitting it needs no conversion either.
+
+    Args:
+        name (str): The system font name, see `fonts.get_font`.
+        size (int): The size of the font.
+        text (str): The text to render.
+        color (pygame.Color): The colour of the text.
+
+    Returns:
+        pygame.Surface: The rendered text.
+    """
+    global renders
+    renders += 1
+    surface = get_font(name, size).render(text, True, color)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    return surface
+
+
+def glyph(name, size, text, color):
+    """
+    Gets the rendered surface of a short text, rendering it only the first time.
+
+    Surfaces are shared by every cell, so once each digit has been seen in each
+    colour nothing is rendered again.
+
+    Args:
+        name (str): The system font name, see `fonts.get_font`.
+        size (int): The size of the font.
+        text (str): The text to render, usually a single digit.
+        color (pygame.Color): The colour of the text.
+
+    Returns:
+        pygame.Surface: The rendered text.
+    """
+    key = (name, size, text, tuple(pygame.Color(color)))
+    surface = _glyphs.get(key)
+    if surface is None:
+        surface = _glyphs[key] = _render(name, size, text, color)
+    return surface
+
+
+def label(name, size, text, color):
+    """
+    Gets the rendered surface of a HUD text, such as the lives left or the clock.
+
+    Unlike digits, these texts keep changing over a game, so only the
+    LABEL_CACHE_SIZE most recently used are kept. That is plenty for a text to be
+    rendered once when it changes and never while it stays the same.
+
+    Args:
+        name (str): The system font name, see `fonts.get_font`.
+        size (int): The size of the font.
+        text (str): The text to render.
+        color (pygame.Color): The colour of the text.
+
+    Returns:
+        pygame.Surface: The rendered text.
+    """
+    key = (name, size, text, tuple(pygame.Color(color)))
+    surface = _labels.get(key)
+    if surface is None:
+        surface = _labels[key] = _render(name, size, text, color)
+        if len(_labels) > LABEL_CACHE_SIZE:
+            _labels.popitem(last=False)
+    else:
+        _labels.move_to_end(key)
+    return surface
+
+
+def notes(mask, SRN, cell_size, background):
+    """
+    Gets a whole cell with its notes drawn in, composing it only the first time.
+
+    The surface holds the background and every noted number at its place in the
+    SRN x SRN layout, so an empty cell is redrawn with a single blit. Surfaces are
+    kept in least recently used order and the oldest are dropped once they take
+    more than NOTES_CACHE_BYTES.
+
+    Args:
+        mask (int): The notes of the cell, bit d - 1 set for the number d.
+        SRN (int): The number of notes on each line of the cell.
+        cell_size (Tuple[int, int]): The size of the cell in pixels.
+        background (pygame.Color): The colour of the cell.
+
+    Returns:
+        pygame.Surface: The cell with its notes.
+    """
+    global _notes_bytes, _notes_hits, _notes_misses
+    key = (mask, SRN, cell_size, tuple(pygame.Color(background)))
+    surface = _notes.get(key)
+    if surface is not None:
+        _notes.move_to_end(key)
+        _notes_hits += 1
+        return surface
+    _notes_misses += 1
+    surface = pygame.Surface(cell_size)
+    surface.fill(background)
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        idx = bit.bit_length() - 1
+        y, x = divmod(idx, SRN)
+        surface.blit(
+            glyph("monospace", cell_size[0] // 3, str(idx + 1), pygame.Color("orange")),
+            ((cell_size[0] // SRN) * x, (cell_size[1] // SRN) * y),
+        )
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    _notes[key] = surface
+    _notes_bytes += surface.get_pitch() * surface.get_height()
+    while _notes_bytes > NOTES_CACHE_BYTES and len(_notes) > 1:
+        _, old = _notes.popitem(last=False)
+        _notes_bytes -= old.get_pitch() * old.get_height()
+    return surface
+
+
+def notes_stats():
+    """
+    Reports how well the notes cache is doing.
+
+    Returns:
+        dict: The hits, the misses, the hit rate, the number of surfaces kept and
+        the bytes they take, along with the cap.
+    """
+    lookups = _notes_hits + _notes_misses
+    return {
+        "hits": _notes_hits,
+        "misses": _notes_misses,
+        "hit_rate": _notes_hits / lookups if lookups else 0.0,
+        "entries": len(_notes),
+        "bytes": _notes_bytes,
+        "cap": NOTES_CACHE_BYTES,
+    }
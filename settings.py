@@ -3,6 +3,14 @@ from itertools import islice
 WIDTH, HEIGHT = 450, 450
 N_CELLS = 9
 CELL_SIZE = (WIDTH // N_CELLS, HEIGHT // N_CELLS)
+# pre-generated puzzles, filled with `python batch.py --bank puzzles.bank`
+BANK_PATH = "puzzles.bank"
+# puzzles kept ready in the background for "New Game"
+PREWARM_DEPTH = 3
+# memory the composed notes surfaces may take, see render_cache.notes
+NOTES_CACHE_BYTES = 2 * 1024 * 1024
+# rendered HUD texts kept, see render_cache.label
+LABEL_CACHE_SIZE = 32
 
 
 def convert_list(lst, var_lst):
@@ -0,0 +1,323 @@
+import math
+
+
+class DancingLinks:
+    def __init__(self, N):
+        """
+        Build the exact-cover matrix of an empty N x N Sudoku on dancing links.
+
+        Every candidate (row, col, num) is a matrix row that covers four
+        constraint columns: the cell itself, `num` in the row, `num` in the
+        column and `num` in the subgroup. The subgroups are SRN x SRN, with
+        SRN computed the same way as in `Sudoku`.
+
+        :param N: The size of the grid
+        :return: None
+        """
+        self.N = N
+        self.SRN = int(math.sqrt(N))
+        if self.SRN * self.SRN != N:
+            raise ValueError(f"grid size {N} is not a perfect square")
+        self.givens = []
+        n_cols = 4 * N * N
+        # node 0 is the root, nodes 1..n_cols are the column headers
+        self.L = list(range(-1, n_cols))
+        self.R = list(range(1, n_cols + 2))
+        self.L[0] = n_cols
+        self.R[n_cols] = 0
+        self.U = list(range(n_cols + 1))
+        self.D = list(range(n_cols + 1))
+        self.C = list(range(n_cols + 1))
+        self.S = [0] * (n_cols + 1)
+        self.row_of = [-1] * (n_cols + 1)
+        self.row_node = []
+        for row in range(N):
+            for col in range(N):
+                box = (row // self.SRN) * self.SRN + col // self.SRN
+                for num in range(N):
+                    self._add_row(
+                        (row * N + col) * N + num,
+                        (
+                            1 + row * N + col,
+                            1 + N * N + row * N + num,
+                            1 + 2 * N * N + col * N + num,
+                            1 + 3 * N * N + box * N + num,
+                        ),
+                    )
+
+    def _add_row(self, row_id, columns):
+        """
+        Append a matrix row with a node in each of the given columns.
+
+        :param row_id: The candidate index of the row
+        :param columns: The header indices of the columns the row covers
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        first = len(C)
+        self.row_node.append(first)
+        for offset, col in enumerate(columns):
+            node = first + offset
+            L.append(node - 1 if offset else first + len(columns) - 1)
+            R.append(node + 1 if offset < len(columns) - 1 else first)
+            U.append(U[col])
+            D.append(col)
+            C.append(col)
+            self.row_of.append(row_id)
+            D[U[col]] = node
+            U[col] = node
+            S[col] += 1
+
+    def _cover(self, col):
+        """
+        Unlink a column header and every row that has a node in it.
+
+        :param col: The header index of the column
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[col]] = L[col]
+        R[L[col]] = R[col]
+        i = D[col]
+        while i != col:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, col):
+        """
+        Relink a column covered by `_cover`, in exactly the reverse order.
+
+        :param col: The header index of the column
+        :return: None
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[col]
+        while i != col:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[col]] = col
+        R[L[col]] = col
+
+    def _select(self, node):
+        """
+        Cover every other column of the row that `node` belongs to.
+
+        :param node: A node of the chosen row
+        :return: None
+        """
+        R, C = self.R, self.C
+        j = R[node]
+        while j != node:
+            self._cover(C[j])
+            j = R[j]
+
+    def _deselect(self, node):
+        """
+        Undo `_select` for the row that `node` belongs to.
+
+        :param node: A node of the chosen row
+        :return: None
+        """
+        L, C = self.L, self.C
+        j = L[node]
+        while j != node:
+            self._uncover(C[j])
+            j = L[j]
+
+    def place(self, row, col, num):
+        """
+        Fix a given number in the matrix by covering all of its columns.
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :param num: The number in the cell, between 1 and N
+        :return: True if the number was placed, False if it clashes with an
+            earlier given
+        """
+        node = self.row_node[(row * self.N + col) * self.N + num - 1]
+        R, L, C = self.R, self.L, self.C
+        j = node
+        while True:
+            # a covered header is no longer linked from its neighbours
+            if R[L[C[j]]] != C[j]:
+                return False
+            j = R[j]
+            if j == node:
+                break
+        self._cover(C[node])
+        self._select(node)
+        self.givens.append(node)
+        return True
+
+    def load(self, grid):
+        """
+        Place every non-zero number of a grid, see `place`.
+
+        :param grid: A list of N lists of N ints, 0 for an empty cell
+        :return: True if all givens were placed, False if the grid breaks a
+            Sudoku rule
+        """
+        if len(grid) != self.N or any(len(line) != self.N for line in grid):
+            raise ValueError(f"expected a {self.N}x{self.N} grid")
+        for row in range(self.N):
+            for col in range(self.N):
+                num = grid[row][col]
+                if num != 0 and not self.place(row, col, num):
+                    return False
+        return True
+
+    def unplace(self):
+        """
+        Remove the most recently placed given.
+
+        :return: None
+        """
+        node = self.givens.pop()
+        self._deselect(node)
+        self._uncover(self.C[node])
+
+    def reset(self):
+        """
+        Remove every given placed since the matrix was built or last reset.
+
+        :return: None
+        """
+        while self.givens:
+            self.unplace()
+
+    def search(self):
+        """
+        Run Algorithm X over the uncovered part of the matrix.
+
+        The search uses an explicit stack, so its depth is not bound by the
+        recursion limit, and always branches on the column with the fewest
+        remaining rows. The matrix is restored to its pre-search state once
+        the generator is exhausted or closed.
+
+        :return: A generator of solutions, each a list of (row, col, num)
+        """
+        R, D, C, S = self.R, self.D, self.C, self.S
+        N = self.N
+        chosen = []
+        try:
+            while True:
+                if R[0] == 0:
+                    solution = []
+                    for node in chosen:
+                        cell, num = divmod(self.row_of[node], N)
+                        solution.append((cell // N, cell % N, num + 1))
+                    yield solution
+                else:
+                    best = R[0]
+                    size = S[best]
+                    col = R[best]
+                    while col != 0 and size > 1:
+                        if S[col] < size:
+                            best = col
+                            size = S[col]
+                        col = R[col]
+                    if size > 0:
+                        self._cover(best)
+                        node = D[best]
+                        chosen.append(node)
+                        self._select(node)
+                        continue
+                # backtrack to the deepest column with an untried row
+                while chosen:
+                    node = chosen.pop()
+                    self._deselect(node)
+                    col = C[node]
+                    node = D[node]
+                    if node != col:
+                        chosen.append(node)
+                        self._select(node)
+                        break
+                    self._uncover(col)
+                else:
+                    return
+        finally:
+            while chosen:
+                node = chosen.pop()
+                self._deselect(node)
+                self._uncover(C[node])
+
+    def count(self, limit=None):
+        """
+        Count the solutions of the matrix with its current givens.
+
+        :param limit: Stop counting once this many solutions are found
+        :return: The number of solutions, at most `limit`
+        """
+        count = 0
+        search = self.search()
+        for _ in search:
+            count += 1
+            if count == limit:
+                search.close()
+                break
+        return count
+
+
+def _grid_size(grid):
+    """
+    Return the size N of a square grid.
+
+    :param grid: A list of lists of ints
+    :return: The number of rows of the grid
+    """
+    N = len(grid)
+    if N == 0 or any(len(line) != N for line in grid):
+        raise ValueError("grid must be a non-empty square list of lists")
+    return N
+
+
+def iter_solutions(grid):
+    """
+    Yield every solution of a Sudoku grid.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: A generator of solved grids, each a new list of lists
+    """
+    links = DancingLinks(_grid_size(grid))
+    if not links.load(grid):
+        return
+    for solution in links.search():
+        solved = [line[:] for line in grid]
+        for row, col, num in solution:
+            solved[row][col] = num
+        yield solved
+
+
+def solve(grid):
+    """
+    Solve a Sudoku grid.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: The first solution found, or None if the grid has no solution
+    """
+    return next(iter_solutions(grid), None)
+
+
+def count_solutions(grid, limit=None):
+    """
+    Count the solutions of a Sudoku grid.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param limit: Stop counting once this many solutions are found
+    :return: The number of solutions, at most `limit`
+    """
+    links = DancingLinks(_grid_size(grid))
+    if not links.load(grid):
+        return 0
+    return links.count(limit)
+
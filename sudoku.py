@@ -1,16 +1,32 @@
 import random
 import math
-import copy
+from solver import DancingLinks
+from grader import BANDS, grade
 
 class Sudoku:
-    def __init__(self, N, E):
+    def __init__(self, N, E, unique=False, seed=None, generate=True, max_steps=None, band=None, max_attempts=None):
         self.N = N
         self.E = E
+        # private random stream, so seeded tables are reproducible
+        self.random = random.Random(seed)
+        # only dig holes that keep the puzzle to a single solution
+        self.unique = unique
+        # step budget of one fill attempt, None to search until done
+        self.max_steps = max_steps
+        self.restarts = 0
+        # target difficulty, a grader.Band or the name of one in grader.BANDS
+        self.band = BANDS[band] if isinstance(band, str) else band
+        if self.band is not None:
+            self.unique = True
+        self.max_attempts = max_attempts
+        self.attempts = 0
+        self.grade = None
         # compute square root of N
         self.SRN = int(math.sqrt(N))
-        self.table = [[0 for x in range(N)] for y in range(N)]
+        self.clear_table()
         self.answerable_table = None
-        self._generate_table()
+        if generate:
+            self._generate_table()
 
     def _generate_table(self):
         # fill the subgroups diagonally table/matrices
@@ -24,13 +40,52 @@ class Sudoku:
 
         The table is then modified to remove E random digits, leaving the
         resulting Sudoku puzzle.
+
+        A fill that reaches a dead end starts over from a new diagonal, since
+        some diagonals can't be completed at all. With a step budget, a fill
+        that runs out of steps starts over too, which cuts off the long tail
+        of the backtracking search.
+
+        With a difficulty band, a puzzle that ends up too easy for the band is
+        thrown away and a new table is generated, up to max_attempts times.
+        """
+        while True:
+            self.attempts += 1
+            self.fill_table()
+            # Remove random Key digits to make game
+            self.remove_digits()
+            if self.band is None or self.band.contains(self.grade):
+                return
+            if self.attempts == self.max_attempts:
+                raise RuntimeError(f"no puzzle in the requested band after {self.attempts} attempts")
+            self.clear_table()
+
+    def fill_table(self):
+        """
+        Fill the empty table with a complete answer, the first step of
+        `_generate_table`.
+
+        :return: None
         """
         self.fill_diagonal()
         # fill remaining empty subgroups
-        self.fill_remaining(0, self.SRN)
-        # Remove random Key digits to make game
-        self.remove_digits()
-        
+        while not self.fill_remaining(0, self.SRN, self.max_steps):
+            self.restarts += 1
+            self.clear_table()
+            self.fill_diagonal()
+
+    def clear_table(self):
+        """
+        Empty every cell of the table.
+
+        :return: None
+        """
+        self.table = [[0 for x in range(self.N)] for y in range(self.N)]
+        # used-digit bitmasks, bit `num` is set once `num` is placed
+        self.row_used = [0] * self.N
+        self.col_used = [0] * self.N
+        self.box_used = [0] * self.N
+
     def fill_diagonal(self):
         """
         Fill the diagonal subgroups of the table.
@@ -40,6 +95,49 @@ class Sudoku:
         for x in range(0, self.N, self.SRN):
             self.fill_cell(x, x)
     
+    def box_index(self, row, col):
+        """
+        Return the index of the subgroup containing a given cell.
+
+        Subgroups are numbered left to right, top to bottom.
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :return: The subgroup index, between 0 and N - 1
+        """
+        return (row // self.SRN) * self.SRN + col // self.SRN
+
+    def set_cell(self, row, col, num):
+        """
+        Place a number in the table and mark it as used in its row, column
+        and subgroup.
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :param num: The number to place
+        :return: None
+        """
+        bit = 1 << num
+        self.table[row][col] = num
+        self.row_used[row] |= bit
+        self.col_used[col] |= bit
+        self.box_used[self.box_index(row, col)] |= bit
+
+    def clear_cell(self, row, col):
+        """
+        Empty a cell of the table and release its number from the row,
+        column and subgroup masks.
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :return: None
+        """
+        bit = ~(1 << self.table[row][col])
+        self.table[row][col] = 0
+        self.row_used[row] &= bit
+        self.col_used[col] &= bit
+        self.box_used[self.box_index(row, col)] &= bit
+
     def not_in_subgroup(self, rowstart, colstart, num):
         """
         Check if a number already exists in a subgroup.
@@ -49,11 +147,7 @@ class Sudoku:
         :param num: The number to check for
         :return: True if not in subgroup, False if it is
         """
-        for x in range(self.SRN):
-            for y in range(self.SRN):
-                if self.table[rowstart + x][colstart + y] == num:
-                    return False
-        return True
+        return not self.box_used[self.box_index(rowstart, colstart)] & (1 << num)
     
     def fill_cell(self, row, col):
         
@@ -71,7 +165,8 @@ class Sudoku:
                     num = self.random_generator(self.N)
                     if self.not_in_subgroup(row, col, num):
                         break
-                self.table[row + x][col + y] = num
+                self.set_cell(row + x, col + y, num)
+
     def random_generator(self, num):
         """
         Return a random integer between 1 and num (inclusive).
@@ -79,7 +174,7 @@ class Sudoku:
         :param num: The maximum number
         :return: A random integer
         """
-        return math.floor(random.random() * num + 1)
+        return math.floor(self.random.random() * num + 1)
 
     def safe_position(self, row, col, num):
         
@@ -91,7 +186,8 @@ class Sudoku:
         :param num: The number to check
         :return: True if the number is safe to place, False otherwise
         """
-        return (self.not_in_row(row, num) and self.not_in_col(col, num) and self.not_in_subgroup(row - row % self.SRN, col - col % self.SRN, num))
+        used = self.row_used[row] | self.col_used[col] | self.box_used[self.box_index(row, col)]
+        return not used & (1 << num)
     
     def not_in_row(self, row, num):
         """
@@ -101,10 +197,7 @@ class Sudoku:
         :param num: The number to check
         :return: True if not in row, False if it is
         """
-        for col in range(self.N):
-            if self.table[row][col] == num:
-                return False
-        return True
+        return not self.row_used[row] & (1 << num)
     
     def not_in_col(self, col, num):
         """
@@ -114,49 +207,92 @@ class Sudoku:
         :param num: The number to check
         :return: True if not in column, False if it is
         """
-        for row in range(self.N):
-            if self.table[row][col] == num:
-                return False
-        return True
+        return not self.col_used[col] & (1 << num)
     
-    def fill_remaining(self, row, col):
-        # check if we have reached the end of the matrix
+    def fill_remaining(self, row, col, max_steps=None):
         """
-        Recursively fill the Sudoku table with a valid value in each cell.
-        
-        :param row: The current row
-        :param col: The current column
+        Fill the empty cells of the table, from the given cell onwards, with a valid value each.
+
+        Cells are visited in row-major order and each one tries its numbers in
+        increasing order, backtracking on a dead end. The search keeps its own
+        stack of untried numbers per cell instead of recursing, so the Python
+        recursion limit does not cap the size of the table.
+
+        :param row: The row of the first cell to fill
+        :param col: The column of the first cell to fill
+        :param max_steps: Give up after placing this many numbers, leaving the
+            table as far as the search got
         :return: True if the table is fully filled, False otherwise
         """
-        if row == self.N - 1 and col == self.N:
+        N = self.N
+        SRN = self.SRN
+        table = self.table
+        row_used, col_used, box_used = self.row_used, self.col_used, self.box_used
+        cells = []
+        for idx in range(row * N + col, N * N):
+            r, c = divmod(idx, N)
+            if table[r][c] == 0:
+                cells.append((r, c, (r // SRN) * SRN + c // SRN))
+        if not cells:
             return True
-        # move to the next row if we have reached the end of the current row
-        if col == self.N:
-            row += 1
-            col = 0
-        # skip cells that are already filled
-        if self.table[row][col] != 0:
-            return self.fill_remaining(row, col + 1)
-        # try filling the current cell with a valid value
-        for num in range(1, self.N + 1):
-            if self.safe_position(row, col, num):
-                self.table[row][col] = num
-                if self.fill_remaining(row, col + 1):
-                    return True
-                self.table[row][col] = 0
-        # no valid value was found, so backtrack
+        # bits 1..N stand for the numbers 1..N
+        all_nums = ((1 << N) - 1) << 1
+        # untried[d] holds the numbers still to try in cells[d]
+        untried = [0] * len(cells)
+        r, c, b = cells[0]
+        untried[0] = all_nums & ~(row_used[r] | col_used[c] | box_used[b])
+        depth = 0
+        steps = 0
+        while depth >= 0:
+            r, c, b = cells[depth]
+            num = table[r][c]
+            if num != 0:
+                # take back the number tried last time round
+                bit = ~(1 << num)
+                table[r][c] = 0
+                row_used[r] &= bit
+                col_used[c] &= bit
+                box_used[b] &= bit
+            options = untried[depth]
+            if options == 0:
+                depth -= 1
+                continue
+            bit = options & -options
+            untried[depth] = options ^ bit
+            table[r][c] = bit.bit_length() - 1
+            row_used[r] |= bit
+            col_used[c] |= bit
+            box_used[b] |= bit
+            depth += 1
+            if depth == len(cells):
+                return True
+            steps += 1
+            if steps == max_steps:
+                return False
+            r, c, b = cells[depth]
+            untried[depth] = all_nums & ~(row_used[r] | col_used[c] | box_used[b])
+        # no valid value was found for the first cell, so the table can't be filled
         return False
-    
+
     def remove_digits(self):
         """
         Removes a certain amount of numbers from the Sudoku table to create a puzzle
         sheet. The numbers are chosen randomly, and the table is modified in-place.
+
+        In unique mode the removals are checked instead, see
+        `remove_digits_unique`.
         
         :return: None
+        :raises ValueError: If the table is not fully filled
         """
+        if any(0 in line for line in self.table):
+            raise ValueError("holes can only be dug in a fully filled table")
         count = self.E
         # replicates the table so we can have a filled and pre-filled copy
-        self.answerable_table = copy.deepcopy(self.table)
+        self.answerable_table = [line[:] for line in self.table]
+        if self.unique:
+            self.remove_digits_unique()
+            return
         # removing random numbers to create the puzzle sheet
         while (count != 0):
             row = self.random_generator(self.N) - 1
@@ -164,7 +300,69 @@ class Sudoku:
             if (self.answerable_table[row][col] != 0):
                 count -= 1
                 self.answerable_table[row][col] = 0
-                
+
+    def remove_digits_unique(self):
+        """
+        Remove up to E numbers from the puzzle table while keeping its solution unique.
+
+        Cells are visited in random order. Each removal is checked by counting
+        the solutions of the resulting puzzle, stopping at 2, and is undone if
+        the table is no longer the only answer. Fewer than E numbers are removed
+        when no further cell can be emptied.
+
+        With a difficulty band, every removal is also graded and undone if it
+        makes the puzzle too hard for the band, and the last grade is kept in
+        `self.grade`.
+
+        :return: The number of cells emptied
+        """
+        cells = [(row, col) for row in range(self.N) for col in range(self.N)]
+        self.random.shuffle(cells)
+        # givens are a stack: unvisited cells below, in visiting order, with
+        # the cells that had to be kept on top of them
+        links = DancingLinks(self.N)
+        for row, col in reversed(cells):
+            self._place_given(links, row, col)
+        kept = []
+        removed = 0
+        if self.band is not None:
+            self.grade = grade(self.answerable_table)
+        for row, col in cells:
+            if removed == self.E:
+                break
+            for _ in range(len(kept) + 1):
+                links.unplace()
+            for kept_row, kept_col in kept:
+                self._place_given(links, kept_row, kept_col)
+            if links.count(2) == 1:
+                self.answerable_table[row][col] = 0
+                if self.band is None:
+                    removed += 1
+                    continue
+                graded = grade(self.answerable_table)
+                if not self.band.too_hard(graded):
+                    self.grade = graded
+                    removed += 1
+                    continue
+                self.answerable_table[row][col] = self.table[row][col]
+            self._place_given(links, row, col)
+            kept.append((row, col))
+        return removed
+
+    def _place_given(self, links, row, col):
+        """
+        Place the answer of a cell in the solution counter of `remove_digits_unique`.
+
+        :param links: The DancingLinks matrix holding the givens
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :return: None
+        :raises ValueError: If the table is not a fully filled, valid answer
+        """
+        num = self.table[row][col]
+        if num == 0 or not links.place(row, col, num):
+            raise ValueError("holes can only be dug in a fully filled, valid table")
+
     def puzzle_table(self):
         """
         Returns the puzzle table, which is a copy of the original table but with some numbers removed.
@@ -1,42 +1,62 @@
 import pygame
 import math
 from cell import Cell
-from sudoku import Sudoku
+from puzzle_queue import new_puzzle
 from clock import Clock
+from game_state import GameState
+from render_cache import label
 
 from settings import WIDTH, HEIGHT, N_CELLS, CELL_SIZE
 
 pygame.font.init()
 
+# the colour left see-through on the grid layer
+GRID_KEY = (255, 0, 255)
+
 class Table:
-    def __init__(self, screen):
+    def __init__(self, screen, bank=None, puzzle=None):
         """
         Initialises the table with a puzzle and a game clock.
         
-        Also initialises the game state variables and the font used for the game buttons.
+        The rules and the state of the game live in a `GameState`, and the table is a
+        view over it: it turns clicks into game actions and redraws what they change.
+
+        Args:
+            screen (pygame.Surface): The surface to draw onto.
+            bank (PuzzleBank, optional): A bank of pre-generated puzzles to draw from
+                instead of generating a new puzzle.
+            puzzle (tuple, optional): A ready (puzzle, answers) pair, as returned by
+                `new_puzzle`, to play instead of drawing or generating one.
         """
 
         self.screen = screen
-        self.puzzle = Sudoku(N_CELLS, (N_CELLS * N_CELLS) // 2)
         self.clock = Clock()
-        self.answers = self.puzzle.puzzle_answers()
-        self.answerable_table = self.puzzle.puzzle_table()
-        self.SRN = self.puzzle.SRN
+        if puzzle is None:
+            puzzle = new_puzzle(bank)
+        self.state = GameState(*puzzle)
+        self.SRN = int(math.sqrt(N_CELLS))
         self.table_cells = []
+        self.cell_grid = []
         self.num_choices = []
         self.clicked_cell = None
         self.clicked_num_below = None
         self.cell_to_empty = None
         self.making_move = False
-        self.guess_mode = True
-        self.lives = 3
-        self.game_over = False
         self.delete_button = pygame.Rect(0, (HEIGHT + CELL_SIZE[1]), (CELL_SIZE[0] * 3), (CELL_SIZE[1]))
         self.guess_button = pygame.Rect((CELL_SIZE[0] * 6), (HEIGHT + CELL_SIZE[1]), (CELL_SIZE[0] * 3), (CELL_SIZE[1]))
-        self.font = pygame.font.SysFont('Bauhaus 93', (CELL_SIZE[0] // 2))
         self.font_color = pygame.Color("white")
+        # the static layers, built by _layers on first use
+        self.background = None
+        self.grid = None
+        self.grid_rect = pygame.Rect(0, 0, WIDTH + 3, HEIGHT + 3)
+        self.layers_key = None
         self._generate_game()
-        self.clock.start_timer()
+        # everything starts out dirty, nothing has been drawn yet
+        self.dirty_cells = self.table_cells + self.num_choices
+        self.buttons_dirty = True
+        self.clock_seconds = 0
+        self.clock_surface = self.clock.display_timer()
+        self.clock_rect = self.clock_surface.get_rect(topleft=(WIDTH // self.SRN, HEIGHT + CELL_SIZE[1]))
 
     def _generate_game(self):
         # generating sudoku table
@@ -44,24 +64,28 @@ class Table:
         Generate the Sudoku table and number choices.
 
         The table is generated first, with each cell's value being the corresponding
-        value in the `answerable_table`. The `is_correct_guess` parameter is set to
-        `True` if the cell's value is not 0.
+        value on the board of the game state. The `is_correct_guess` parameter is set to
+        `True` if the cell's value is not 0. `cell_grid[row][col]` holds the cell at
+        each position of the screen, so finding a cell never scans the whole board.
 
         Then, the number choices are generated, with each cell's value being its
         1-indexed position in the list of number choices.
         """
+        self.cell_grid = [[None] * N_CELLS for _ in range(N_CELLS)]
         for y in range(N_CELLS):
             for x in range(N_CELLS):
-                cell_value = self.answerable_table[y][x]
+                cell_value = self.state.board[y][x]
                 is_correct_guess = True if cell_value != 0 else False
-                self.table_cells.append(Cell(x, y, CELL_SIZE, cell_value, is_correct_guess))
+                cell = Cell(x, y, CELL_SIZE, cell_value, is_correct_guess)
+                self.table_cells.append(cell)
+                self.cell_grid[x][y] = cell
         # generating number choices
         for x in range(N_CELLS):
             self.num_choices.append(Cell(x, N_CELLS, CELL_SIZE, x + 1))
             
-    def _draw_grid(self):
+    def _draw_grid(self, surface):
         """
-        Draws the Sudoku grid on the screen.
+        Draws the Sudoku grid onto a surface.
 
         The grid is drawn by drawing multiple horizontal and vertical lines of different
         thicknesses. The thickness of the lines alternate between 2 and 4, with a different
@@ -69,20 +93,32 @@ class Table:
 
         The lines are drawn from the top-left of the screen to the bottom-right, with the
         vertical lines being drawn first and then the horizontal lines.
+
+        Each line is filled in as a rectangle rather than drawn with `pygame.draw.line`,
+        which drops a thick line entirely when its centre falls outside the clipping
+        area, so redrawing one cell would lose the lines along its edges.
+
+        Args:
+            surface (pygame.Surface): The surface to draw onto, the grid layer.
         """
         grid_color = (50, 80, 80)
-        pygame.draw.rect(self.screen, grid_color, (-3, -3, WIDTH + 6, HEIGHT + 6), 6)
+        # the border, 3 pixels of it on the screen at the top and the left
+        surface.fill(grid_color, (0, 0, WIDTH + 3, 3))
+        surface.fill(grid_color, (0, HEIGHT - 3, WIDTH + 3, 6))
+        surface.fill(grid_color, (0, 0, 3, HEIGHT + 3))
+        surface.fill(grid_color, (WIDTH - 3, 0, 6, HEIGHT + 3))
         i = 1
         while (i * CELL_SIZE[0]) < WIDTH:
             line_size = 2 if i % 3 > 0 else 4
-            pygame.draw.line(self.screen, grid_color, ((i * CELL_SIZE[0]) - (line_size // 2), 0), ((i * CELL_SIZE[0]) - (line_size // 2), HEIGHT), line_size)
-            pygame.draw.line(self.screen, grid_color, (0, (i * CELL_SIZE[0]) - (line_size // 2)), (HEIGHT, (i * CELL_SIZE[0]) - (line_size // 2)), line_size)
+            start = (i * CELL_SIZE[0]) - (line_size // 2) - (line_size // 2) + 1
+            surface.fill(grid_color, (start, 0, line_size, HEIGHT + 1))
+            surface.fill(grid_color, (0, start, HEIGHT + 1, line_size))
             i += 1
 
-    def _draw_buttons(self):
+    def _draw_buttons(self, surface):
         # adding delete button details
         """        
-        Draws the delete and guess buttons on the screen.
+        Draws the delete and guess buttons onto a surface.
 
         The delete button is drawn at the top-left of the screen, with the text "Delete"
         centered in the button. The button is drawn in red.
@@ -90,20 +126,46 @@ class Table:
         The guess button is drawn at the top-right of the screen, with the text "Guess: On"
         if the guess mode is on, or "Guess: Off" if the guess mode is off. The button is
         drawn in blue if the guess mode is on, or purple if the guess mode is off.
+
+        Args:
+            surface (pygame.Surface): The surface to draw onto, the background layer.
         """
         dl_button_color = pygame.Color("red")
-        pygame.draw.rect(self.screen, dl_button_color, self.delete_button)
-        del_msg = self.font.render("Delete", True, self.font_color)
-        self.screen.blit(del_msg, (self.delete_button.x + (CELL_SIZE[0] // 2), self.delete_button.y + (CELL_SIZE[1] // 4)))
+        pygame.draw.rect(surface, dl_button_color, self.delete_button)
+        del_msg = label('Bauhaus 93', CELL_SIZE[0] // 2, "Delete", self.font_color)
+        surface.blit(del_msg, (self.delete_button.x + (CELL_SIZE[0] // 2), self.delete_button.y + (CELL_SIZE[1] // 4)))
         # adding guess button details
-        gss_button_color = pygame.Color("blue") if self.guess_mode else pygame.Color("purple")
-        pygame.draw.rect(self.screen, gss_button_color, self.guess_button)
-        gss_msg = self.font.render("Guess: On" if self.guess_mode else "Guess: Off", True, self.font_color)
-        self.screen.blit(gss_msg, (self.guess_button.x + (CELL_SIZE[0] // 3), self.guess_button.y + (CELL_SIZE[1] // 4)))
+        gss_button_color = pygame.Color("blue") if self.state.guess_mode else pygame.Color("purple")
+        pygame.draw.rect(surface, gss_button_color, self.guess_button)
+        gss_msg = label('Bauhaus 93', CELL_SIZE[0] // 2, "Guess: On" if self.state.guess_mode else "Guess: Off", self.font_color)
+        surface.blit(gss_msg, (self.guess_button.x + (CELL_SIZE[0] // 3), self.guess_button.y + (CELL_SIZE[1] // 4)))
         
+    def _layers(self):
+        """
+        Builds the static layers of the screen, or reuses them if nothing they show changed.
+
+        The background layer holds the gray backdrop and the game buttons with their
+        labels, and the grid layer holds the grid lines, with everything else see-through.
+        Both are rebuilt only when the guess mode or the size of the screen changes.
+
+        Returns:
+            tuple: The background and grid layers, as pygame.Surface objects.
+        """
+        key = (self.state.guess_mode, self.screen.get_size())
+        if key != self.layers_key:
+            self.background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+            self.background.fill("gray")
+            self._draw_buttons(self.background)
+            self.grid = pygame.Surface((WIDTH + 3, HEIGHT + 3), 0, self.screen)
+            self.grid.fill(GRID_KEY)
+            self._draw_grid(self.grid)
+            self.grid.set_colorkey(GRID_KEY, pygame.RLEACCEL)
+            self.layers_key = key
+        return self.background, self.grid
+
     def _get_cell_from_pos(self, pos):
         """
-        Gets the cell at the given position from the list of table cells.
+        Gets the cell at the given position from the cell index.
         
         Args:
             pos (Tuple[int, int]): The position of the cell to get, given as a tuple of (row, col).
@@ -111,93 +173,55 @@ class Table:
         Returns:
             Cell: The cell at the given position, or None if there is no cell at that position.
         """
-        for cell in self.table_cells:
-            if (cell.row, cell.col) == (pos[0], pos[1]):
-                return cell
-        
-       # checking rows, cols, and subgroups for adding guesses on each cell
-    def _not_in_row(self, row, num):
+        if 0 <= pos[0] < N_CELLS and 0 <= pos[1] < N_CELLS:
+            return self.cell_grid[pos[0]][pos[1]]
+        return None
+
+    def _mark_dirty(self, cell):
         """
-        Checks if a number already exists in a given row.
-        
+        Flags a cell to be redrawn on the next frame.
+
         Args:
-            row (int): The row to check.
-            num (int): The number to check.
-        
-        Returns:
-            bool: True if the number is not in the row, False if it is.
+            cell (Cell): The cell that changed.
         """
-        for cell in self.table_cells:
-            if cell.row == row:
-                if cell.value == num:
-                    return False
-        return True
-    
-    def _not_in_col(self, col, num):
+        if not cell.dirty:
+            cell.dirty = True
+            self.dirty_cells.append(cell)
+
+    def _sync(self, changed):
         """
-        Checks if a number already exists in a given column.
-        
+        Copies the cells changed by a game action from the game state, and flags them
+        to be redrawn.
+
         Args:
-            col (int): The column to check.
-            num (int): The number to check.
-        
-        Returns:
-            bool: True if the number is not in the column, False if it is.
+            changed (list): The (row, col) positions on the board that changed.
         """
-        for cell in self.table_cells:
-            if cell.col == col:
-                if cell.value == num:
-                    return False
-        return True
+        for row, col in changed:
+            cell = self.cell_grid[col][row]
+            cell.value = self.state.board[row][col]
+            cell.guesses = self.state.notes[row][col]
+            cell.is_correct_guess = cell.value != 0 and not self.state.is_wrong(row, col)
+            self._mark_dirty(cell)
 
-    def _not_in_subgroup(self, rowstart, colstart, num):
+    def _cells_in(self, rect):
         """
-        Checks if a number already exists in a given subgroup.
-        
+        Gets the table cells overlapping a rectangle of the screen.
+
         Args:
-            rowstart (int): The top-left row of the subgroup.
-            colstart (int): The top-left column of the subgroup.
-            num (int): The number to check.
-        
+            rect (pygame.Rect): The area of the screen.
+
         Returns:
-            bool: True if the number is not in the subgroup, False if it is.
+            list: The cells overlapping the area, found through the cell index.
         """
+        area = rect.clip(pygame.Rect(0, 0, CELL_SIZE[0] * N_CELLS, CELL_SIZE[1] * N_CELLS))
+        if not area:
+            return []
+        return [
+            self.cell_grid[row][col]
+            for row in range(area.left // CELL_SIZE[0], (area.right - 1) // CELL_SIZE[0] + 1)
+            for col in range(area.top // CELL_SIZE[1], (area.bottom - 1) // CELL_SIZE[1] + 1)
+        ]
 
-        for x in range(self.SRN):
-            for y in range(self.SRN):
-                current_cell = self._get_cell_from_pos((rowstart + x, colstart + y))
-                if current_cell.value == num:
-                    return False
-        return True
-    
-        # remove numbers in guess if number already guessed in the same row, col, subgroup correctly
-    def _remove_guessed_num(self, row, col, rowstart, colstart, num):
-        """
-        Removes a number from the guesses of all cells in the same row, column, and subgroup as the given cell.
-        
-        Args:
-            row (int): The row of the cell to compare with.
-            col (int): The column of the cell to compare with.
-            rowstart (int): The top-left row of the subgroup.
-            colstart (int): The top-left column of the subgroup.
-            num (int): The number to remove from the guesses.
-        """
-        for cell in self.table_cells:
-            if cell.row == row and cell.guesses != None:
-                for x_idx,guess_row_val in enumerate(cell.guesses):
-                    if guess_row_val == num:
-                        cell.guesses[x_idx] = 0
-            if cell.col == col and cell.guesses != None:
-                for y_idx,guess_col_val in enumerate(cell.guesses):
-                    if guess_col_val == num:
-                        cell.guesses[y_idx] = 0
-        for x in range(self.SRN):
-            for y in range(self.SRN):
-                current_cell = self._get_cell_from_pos((rowstart + x, colstart + y))
-                if current_cell.guesses != None:
-                    for idx,guess_val in enumerate(current_cell.guesses):
-                        if guess_val == num:
-                            current_cell.guesses[idx] = 0
     def handle_mouse_click(self, pos):
         x, y = pos[0], pos[1]
         # getting table cell clicked
@@ -210,7 +234,7 @@ class Table:
                 self.clicked_cell = clicked_cell
                 self.making_move = True
             # clicked unempty cell but with wrong number guess
-            elif clicked_cell.value != 0 and clicked_cell.value != self.answers[y][x]:
+            elif self.state.is_wrong(y, x):
                 self.cell_to_empty = clicked_cell
         # getting number selected
         elif x <= WIDTH and y >= HEIGHT and y <= (HEIGHT + CELL_SIZE[1]):
@@ -219,74 +243,83 @@ class Table:
         # deleting numbers
         elif x <= (CELL_SIZE[0] * 3) and y >= (HEIGHT + CELL_SIZE[1]) and y <= (HEIGHT + CELL_SIZE[1] * 2):
             if self.cell_to_empty:
-                self.cell_to_empty.value = 0
+                self._sync(self.state.erase(self.cell_to_empty.col, self.cell_to_empty.row))
                 self.cell_to_empty = None
         # selecting modes
         elif x >= (CELL_SIZE[0] * 6) and y >= (HEIGHT + CELL_SIZE[1]) and y <= (HEIGHT + CELL_SIZE[1] * 2):
-            self.guess_mode = True if not self.guess_mode else False
+            self.state.toggle_mode()
+            self.buttons_dirty = True
         # if making a move
         if self.clicked_num_below and self.clicked_cell != None and self.clicked_cell.value == 0:
-            current_row = self.clicked_cell.row
-            current_col = self.clicked_cell.col
-            rowstart = self.clicked_cell.row - self.clicked_cell.row % self.SRN
-            colstart = self.clicked_cell.col - self.clicked_cell.col % self.SRN
-            if self.guess_mode:
-                # checking the vertical group, the horizontal group, and the subgroup
-                if self._not_in_row(current_row, self.clicked_num_below) and self._not_in_col(current_col, self.clicked_num_below):
-                    if self._not_in_subgroup(rowstart, colstart, self.clicked_num_below):
-                        if self.clicked_cell.guesses != None:
-                            self.clicked_cell.guesses[self.clicked_num_below - 1] = self.clicked_num_below
+            row, col = self.clicked_cell.col, self.clicked_cell.row
+            if self.state.guess_mode:
+                self._sync(self.state.note(row, col, self.clicked_num_below))
             else:
-                self.clicked_cell.value = self.clicked_num_below
-                # if the player guess correctly
-                if self.clicked_num_below == self.answers[self.clicked_cell.col][self.clicked_cell.row]:
-                    self.clicked_cell.is_correct_guess = True
-                    self.clicked_cell.guesses = None
-                    self._remove_guessed_num(current_row, current_col, rowstart, colstart, self.clicked_num_below)
-                # if guess is wrong
-                else:
-                    self.clicked_cell.is_correct_guess = False
-                    self.clicked_cell.guesses = [0 for x in range(9)]
-                    self.lives -= 1
+                self._sync(self.state.place(row, col, self.clicked_num_below))
             self.clicked_num_below = None
             self.making_move = False
         else:
             self.clicked_num_below = None
             
-    def _puzzle_solved(self):
+    def update(self):
         """
-        Checks if the puzzle has been solved correctly.
+        Collects the parts of the screen that changed.
+        
+        This method is called once per frame. The game state itself only changes through
+        the actions taken in `handle_mouse_click`, so this only moves the game clock on
+        and gathers the cells the actions changed. Nothing is drawn here: the caller
+        redraws each returned rectangle with `draw` and pushes only those to the
+        display, so a frame where nothing changed costs nothing.
 
         Returns:
-            bool: If the puzzle has been solved correctly, it returns True. Otherwise, it returns False.
+            list: The pygame.Rect areas of the screen that need redrawing.
         """
+        rects = []
+        for cell in self.dirty_cells:
+            cell.dirty = False
+            rects.append(cell.rect)
+        self.dirty_cells = []
+        if self.buttons_dirty:
+            self.buttons_dirty = False
+            rects.append(self.guess_button)
+        self.clock.elapsed_time = self.state.elapsed()
+        # the clock only changes on the screen once a second
+        if int(self.clock.elapsed_time) != self.clock_seconds:
+            self.clock_seconds = int(self.clock.elapsed_time)
+            self.clock_surface = self.clock.display_timer()
+            rects.append(self.clock_rect)
+        return rects
 
-        check = None
-        for cell in self.table_cells:
-            if cell.value == self.answers[cell.col][cell.row]:
-                check = True
-            else:
-                check = False
-                break
-        return check
-    
-    def update(self):
+    def draw_background(self, rect):
         """
-        Updates the game state and redraws the game elements on the screen.
-        
-        This method is called once per frame and is responsible for updating the game state
-        by checking if the puzzle has been solved or if the player has run out of lives.
-        It also redraws all the game elements on the screen, including the puzzle cells, the
-        number buttons, and the game clock.
+        Redraws the backdrop and the game buttons in a rectangle of the screen.
+
+        This is a single blit from the background layer, and it comes before anything
+        else drawn in `rect`.
+
+        Args:
+            rect (pygame.Rect): The area of the screen to redraw.
         """
-        
-        [cell.update(self.screen, self.SRN) for cell in self.table_cells]
-        [num.update(self.screen) for num in self.num_choices]
-        self._draw_grid()
-        self._draw_buttons()
-        if self._puzzle_solved() or self.lives == 0:
-            self.clock.stop_timer()
-            self.game_over = True
-        else:
-            self.clock.update_timer()
-        self.screen.blit(self.clock.display_timer(), (WIDTH // self.SRN,HEIGHT + CELL_SIZE[1]))
\ No newline at end of file
+        self.screen.blit(self._layers()[0], rect, rect)
+
+    def draw(self, rect):
+        """
+        Redraws the game elements overlapping a rectangle of the screen.
+
+        The elements are drawn in the usual order, the puzzle cells, the number buttons,
+        the grid and the game clock, but only those touching `rect`. The game buttons
+        are part of the background, see `draw_background`. The caller is expected to
+        clip the screen to `rect` first.
+
+        Args:
+            rect (pygame.Rect): The area of the screen to redraw.
+        """
+        for cell in self._cells_in(rect):
+            cell.update(self.screen, self.SRN)
+        for num in self.num_choices:
+            if num.rect.colliderect(rect):
+                num.update(self.screen)
+        if rect.colliderect(self.grid_rect):
+            self.screen.blit(self._layers()[1], rect, rect)
+        if rect.colliderect(self.clock_rect):
+            self.screen.blit(self.clock_surface, self.clock_rect)
@@ -0,0 +1,74 @@
+import pytest
+
+from batch import generate_graded
+from grader import BANDS, LogicSolver, grade
+
+# Sudoku(9, 55, unique=True, seed=14): the givens already leave two cells with
+# a single candidate, and naked singles alone solve it from there
+NAKED_SINGLES = [
+    [1, 7, 6, 0, 0, 0, 0, 0, 8],
+    [0, 0, 0, 8, 0, 0, 0, 5, 0],
+    [2, 0, 0, 0, 0, 0, 6, 0, 0],
+    [0, 0, 0, 0, 0, 0, 8, 3, 1],
+    [0, 0, 0, 0, 9, 0, 0, 0, 5],
+    [6, 0, 8, 0, 5, 0, 9, 0, 0],
+    [4, 0, 3, 0, 0, 0, 1, 0, 2],
+    [0, 0, 0, 0, 0, 0, 0, 0, 0],
+    [7, 5, 1, 4, 0, 2, 0, 0, 0],
+]
+
+# Sudoku(9, 50, unique=True, seed=51): naked singles solve it, but without
+# the singles left by the givens it was graded as needing a hidden pair
+EASY = [
+    [3, 0, 0, 0, 4, 0, 7, 9, 0],
+    [0, 0, 4, 0, 0, 0, 0, 0, 0],
+    [7, 6, 0, 0, 0, 0, 2, 5, 0],
+    [1, 0, 6, 0, 0, 8, 0, 0, 0],
+    [0, 3, 0, 2, 0, 4, 0, 0, 0],
+    [5, 0, 8, 0, 0, 1, 0, 3, 0],
+    [6, 0, 3, 0, 0, 5, 4, 2, 9],
+    [0, 8, 0, 0, 0, 3, 5, 7, 0],
+    [0, 0, 0, 6, 0, 0, 8, 0, 0],
+]
+
+
+def test_givens_queue_initial_singles():
+    solver = LogicSolver(NAKED_SINGLES)
+    assert sorted(solver.singles) == [
+        cell for cell in range(81)
+        if solver.values[cell] == 0 and solver.cands[cell].bit_count() == 1
+    ]
+    assert solver.singles
+
+
+def test_naked_singles_only():
+    result = grade(NAKED_SINGLES)
+    assert result.solved
+    assert result.hardest == "naked_single"
+    assert result.counts == {"naked_single": 55}
+
+
+def test_hidden_single_without_a_cell_breaks():
+    solver = LogicSolver([[0] * 4 for _ in range(4)])
+    # 1 and 2 can both only go in the first cell of the first row
+    solver.cands[0:4] = [0b0011, 0b1100, 0b1100, 0b1100]
+    solver._hidden_singles()
+    assert solver.broken
+
+
+def test_contradiction_is_not_solved():
+    puzzle = [line[:] for line in NAKED_SINGLES]
+    puzzle[0][3] = 1
+    assert not grade(puzzle).solved
+
+
+def test_naked_singles_puzzle_is_easy():
+    result = grade(EASY)
+    assert result.hardest == "naked_single"
+    assert BANDS["easy"].contains(result)
+    assert not BANDS["medium"].contains(result)
+
+
+def test_unreachable_band_gives_up():
+    with pytest.raises(RuntimeError):
+        list(generate_graded(1, "x_wing", 4, jobs=1, seed=0, max_attempts=20))
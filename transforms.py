@@ -0,0 +1,239 @@
+import math
+import random
+
+
+class Transform:
+    def __init__(self, N, rows=None, cols=None, transpose=False, digits=None):
+        """
+        A validity-preserving rearrangement of an N x N Sudoku grid.
+
+        Any combination of digit relabelings, row and column swaps within a
+        band or stack, band and stack swaps, transposition and rotation comes
+        down to one of these: the grid is optionally transposed, then output
+        row `i` is read from source row `rows[i]`, output column `j` from
+        source column `cols[j]`, and every number `d` is written as
+        `digits[d]`. Applying it is a single pass over the grid.
+
+        :param N: The size of the grid
+        :param rows: The source row of each output row, default unchanged
+        :param cols: The source column of each output column, default unchanged
+        :param transpose: Whether to swap rows and columns first
+        :param digits: The new label of each number, with digits[0] == 0
+        :return: None
+        """
+        self.N = N
+        self.SRN = int(math.sqrt(N))
+        self.rows = list(range(N)) if rows is None else list(rows)
+        self.cols = list(range(N)) if cols is None else list(cols)
+        self.transpose = transpose
+        self.digits = list(range(N + 1)) if digits is None else list(digits)
+        if sorted(self.rows) != list(range(N)) or sorted(self.cols) != list(range(N)):
+            raise ValueError("rows and cols must be permutations of range(N)")
+        if sorted(self.digits) != list(range(N + 1)) or self.digits[0] != 0:
+            raise ValueError("digits must relabel 1..N and keep 0 for empty cells")
+        if not _keeps_groups(self.rows, self.SRN) or not _keeps_groups(self.cols, self.SRN):
+            raise ValueError("rows and cols must keep each band and stack together")
+
+    def apply(self, grid):
+        """
+        Return a transformed copy of a grid.
+
+        :param grid: A list of N lists of N ints, 0 for an empty cell
+        :return: A new list of lists
+        """
+        digits = self.digits
+        if self.transpose:
+            return [[digits[grid[col][row]] for col in self.cols] for row in self.rows]
+        return [[digits[line[col]] for col in self.cols] for line in (grid[row] for row in self.rows)]
+
+    def apply_pair(self, puzzle, solution):
+        """
+        Transform a puzzle and its solution the same way.
+
+        :param puzzle: The puzzle table
+        :param solution: The answer table
+        :return: A new (puzzle, solution) pair
+        """
+        return self.apply(puzzle), self.apply(solution)
+
+
+def _keeps_groups(order, SRN):
+    """
+    Check that each block of SRN positions of an order is read from a single band or stack.
+    """
+    return all(
+        len({source // SRN for source in order[start:start + SRN]}) == 1
+        for start in range(0, len(order), SRN)
+    )
+
+
+def _swap(N, a, b):
+    """
+    Return the identity order of range(N) with positions a and b swapped.
+    """
+    order = list(range(N))
+    order[a], order[b] = order[b], order[a]
+    return order
+
+
+def _swap_groups(N, a, b):
+    """
+    Return the identity order of range(N) with bands or stacks a and b swapped.
+    """
+    SRN = int(math.sqrt(N))
+    order = list(range(N))
+    for offset in range(SRN):
+        order[a * SRN + offset], order[b * SRN + offset] = b * SRN + offset, a * SRN + offset
+    return order
+
+
+def _check_same_group(N, a, b, kind):
+    """
+    Raise ValueError unless rows or columns a and b share a band or stack.
+    """
+    SRN = int(math.sqrt(N))
+    if a // SRN != b // SRN:
+        raise ValueError(f"{kind} {a} and {b} are not in the same {'band' if kind == 'rows' else 'stack'}")
+
+
+def relabel(grid, digits):
+    """
+    Return a copy of a grid with every number d written as digits[d].
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param digits: The new label of each number, with digits[0] == 0
+    :return: A new list of lists
+    """
+    return Transform(len(grid), digits=digits).apply(grid)
+
+
+def swap_rows(grid, a, b):
+    """
+    Return a copy of a grid with two rows of the same band swapped.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param a: The index of the first row
+    :param b: The index of the second row
+    :return: A new list of lists
+    """
+    _check_same_group(len(grid), a, b, "rows")
+    return Transform(len(grid), rows=_swap(len(grid), a, b)).apply(grid)
+
+
+def swap_cols(grid, a, b):
+    """
+    Return a copy of a grid with two columns of the same stack swapped.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param a: The index of the first column
+    :param b: The index of the second column
+    :return: A new list of lists
+    """
+    _check_same_group(len(grid), a, b, "cols")
+    return Transform(len(grid), cols=_swap(len(grid), a, b)).apply(grid)
+
+
+def swap_bands(grid, a, b):
+    """
+    Return a copy of a grid with two bands (rows of subgroups) swapped.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param a: The index of the first band
+    :param b: The index of the second band
+    :return: A new list of lists
+    """
+    return Transform(len(grid), rows=_swap_groups(len(grid), a, b)).apply(grid)
+
+
+def swap_stacks(grid, a, b):
+    """
+    Return a copy of a grid with two stacks (columns of subgroups) swapped.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param a: The index of the first stack
+    :param b: The index of the second stack
+    :return: A new list of lists
+    """
+    return Transform(len(grid), cols=_swap_groups(len(grid), a, b)).apply(grid)
+
+
+def transpose(grid):
+    """
+    Return a copy of a grid mirrored along its main diagonal.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :return: A new list of lists
+    """
+    return Transform(len(grid), transpose=True).apply(grid)
+
+
+def rotate(grid, turns=1):
+    """
+    Return a copy of a grid rotated clockwise by quarter turns.
+
+    :param grid: A list of N lists of N ints, 0 for an empty cell
+    :param turns: The number of quarter turns
+    :return: A new list of lists
+    """
+    N = len(grid)
+    turns %= 4
+    reverse = list(range(N - 1, -1, -1))
+    if turns == 1:
+        return Transform(N, cols=reverse, transpose=True).apply(grid)
+    if turns == 2:
+        return Transform(N, rows=reverse, cols=reverse).apply(grid)
+    if turns == 3:
+        return Transform(N, rows=reverse, transpose=True).apply(grid)
+    return [line[:] for line in grid]
+
+
+def _random_order(N, rng):
+    """
+    Return a random row or column order that keeps bands or stacks together.
+    """
+    SRN = int(math.sqrt(N))
+    groups = list(range(SRN))
+    rng.shuffle(groups)
+    order = []
+    for group in groups:
+        offsets = list(range(SRN))
+        rng.shuffle(offsets)
+        order.extend(group * SRN + offset for offset in offsets)
+    return order
+
+
+def random_transform(N, rng=random):
+    """
+    Draw a random element of the Sudoku symmetry group of an N x N grid.
+
+    :param N: The size of the grid
+    :param rng: The random generator to draw with
+    :return: A `Transform`
+    """
+    digits = list(range(1, N + 1))
+    rng.shuffle(digits)
+    return Transform(
+        N,
+        rows=_random_order(N, rng),
+        cols=_random_order(N, rng),
+        transpose=rng.random() < 0.5,
+        digits=[0] + digits,
+    )
+
+
+def variants(puzzle, solution, count, rng=random):
+    """
+    Derive new puzzles from one puzzle and its solution.
+
+    Each variant is an equally valid puzzle with the same difficulty, since
+    it is the same puzzle seen through a random symmetry.
+
+    :param puzzle: The puzzle table
+    :param solution: The answer table
+    :param count: The number of variants to yield
+    :param rng: The random generator to draw with
+    :return: A generator of (puzzle, solution) pairs
+    """
+    N = len(puzzle)
+    for _ in range(count):
+        yield random_transform(N, rng).apply_pair(puzzle, solution)